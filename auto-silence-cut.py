@@ -1,9 +1,116 @@
 import subprocess
 import json
+import os
+import hashlib
+import threading
+import time
+import sys
+import tempfile
+import shutil
+import socket
+import bisect
+import operator
+from array import array
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 import xml.etree.ElementTree as ET
 from datetime import datetime
+from fractions import Fraction
 from pathlib import Path
 
+# numpy is only needed for the built-in loudness engine, auto-editor works without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# resource does not exist on windows, the run report leaves cpu/memory numbers out there
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# auto-editor's default --silent-speed, this is how silent chunks show up in a v1 export
+SILENT_SPEED = 99999.0
+# CREATE_NO_WINDOW only exists on windows, 0 is the "no flags" value everywhere else
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+DEFAULT_SETTINGS = {
+    "L_TRIM_MARGIN": 0.2,
+    "R_TRIM_MARGIN": 0.2,
+    "USE_AUDIO_TRACK": [0],
+    "GATE_DB": -20.0,
+    "HIGHLIGHT_COLOR": "Orange",
+    "HIGHLIGHT_COLOR_INDEX": 0,
+    "DELETE_SILENCE": False,
+    "SKIP_GUI": False,
+    "ONLY_NEW_CLIPS": False,
+    "UPDATE_TIMELINE": False,
+    # settings below only live in settings.json (no GUI), missing ones fall back to these
+    "ANALYSIS_WORKERS": 0,  # 0 = one per cpu core
+    "CACHE_SIZE_MB": 256,  # 0 = disable the analysis cache
+    "ANALYSIS_BACKEND": "auto-editor",  # "auto-editor" or "numpy" (built-in engine)
+    "LOUDNESS_MEASURE": "peak",  # "peak" or "rms", only used by the numpy backend
+    "APPEND_CHUNK_SIZE": 500,  # segments per AppendToTimeline call, 0 = all at once
+    "JOB_QUEUE_DIR": "",  # shared folder for analysis workers, "" = analyze locally
+    "JOB_TIMEOUT": 120,  # seconds before a silent worker's job is handed out again
+    "MIN_AUDIBLE_SECONDS": 0,  # shorter audible bits become silence, 0 = keep all
+    "MIN_SILENCE_SECONDS": 0,  # shorter pauses between audible bits are kept, 0 = cut all
+    "MAX_SEGMENTS_PER_CLIP": 0,  # fills the shortest pauses until it fits, 0 = no limit
+    "TRACK_GATE_DB": {},  # own threshold per audio track, e.g. {"1": -35.0}
+    "PREVIEW_THRESHOLDS": [-45.0, -40.0, -35.0, -30.0, -25.0, -20.0],  # GUI preview
+    "PREVIEW_MARGINS": [0.1, 0.2, 0.3],  # GUI preview, seconds on both sides
+    "REDUCED_SAMPLE_RATE": 0,  # numpy backend, decode rate of long clips, 0 = full rate
+    "REDUCED_RATE_MINUTES": 20,  # clips at least this long use REDUCED_SAMPLE_RATE
+    "MEDIA_FOLDER": "",  # media pool folder to process, e.g. "Day 1/Interviews", "" = master
+    "SCRATCH_DIR": "",  # local folder for intermediate files, "" = system temp folder
+    "WARM_ANALYSIS": False,  # auto-editor backend, keep auto-editor loaded for the whole run
+    "ANALYSIS_PYTHON": "",  # python with auto-editor installed, "" = python on PATH
+}
+
+# bytes hashed from the start and the end of a file for its fingerprint
+FINGERPRINT_BYTES = 1024 * 1024
+# how much raw pcm the numpy backend reads from ffmpeg at once
+PCM_READ_BYTES = 4 * 1024 * 1024
+# frames per block when a cached loudness envelope is streamed
+ENVELOPE_BLOCK_FRAMES = 4096
+# tries per AppendToTimeline chunk before a clip is given up
+APPEND_ATTEMPTS = 3
+# ffprobe runs at once, probing is mostly waiting on the disk so this can be more than the cores
+PROBE_WORKERS = 8
+# clips per analysis worker that may be started ahead of the one going on the timeline
+ANALYSIS_LOOKAHEAD = 2
+# seconds an analysis helper gets to load auto-editor before auto-editor runs per clip instead
+ANALYSIS_START_TIMEOUT = 60
+# seconds an analysis helper gets per clip before it is stopped and auto-editor runs on its own
+ANALYSIS_CLIP_TIMEOUT = 30 * 60
+
+# scratch folders older than this are left over from a crashed run and get removed
+SCRATCH_MAX_AGE = 24 * 60 * 60
+# seconds between two touches of a live run's scratch folder, so it never looks left over
+SCRATCH_TOUCH_INTERVAL = 60 * 60
+
+# ffprobe results of this run by file path, see probe_media()
+probe_results = {}
+
+# file_fingerprint() results by (path, size, mtime_ns)
+fingerprint_results = {}
+
+# items already on the generated timeline, see update_timeline_index()
+timeline_index = {}
+
+# timings and counters of the current run, see start_run_report()
+run_report = {}
+
+# folder for the intermediate files of this run, see scratch_path()
+scratch = {"dir": None, "stop_touching": None}
+scratch_lock = threading.Lock()
+
+# auto-editor helper processes of this run, see borrow_analysis_server()
+analysis_servers = {"available": None, "idle": [], "running": []}
+analysis_servers_lock = threading.Lock()
+
 # TODO add audio treshhold settings
 # TODO put clips in diff dir instead of root
 
@@ -41,7 +148,8 @@ def input_to_float_dB(text: str) -> float:
 def load_settings() -> bool:
     """Handles loading of settings.json file, if exists = False creates one with default settings. Sets Global vars:
 
-    L_TRIM_MARGIN, R_TRIM_MARGIN, USE_AUDIO_TRACK, HIGHLIGHT_COLOR, HIGHLIGHT_COLOR_INDEX, SKIP_GUI"""
+    L_TRIM_MARGIN, R_TRIM_MARGIN, USE_AUDIO_TRACK, HIGHLIGHT_COLOR, HIGHLIGHT_COLOR_INDEX, SKIP_GUI, ANALYSIS_WORKERS, CACHE_SIZE_MB, ANALYSIS_BACKEND, LOUDNESS_MEASURE, APPEND_CHUNK_SIZE, JOB_QUEUE_DIR, JOB_TIMEOUT, MIN_AUDIBLE_SECONDS, MIN_SILENCE_SECONDS, MAX_SEGMENTS_PER_CLIP, TRACK_GATE_DB, PREVIEW_THRESHOLDS, PREVIEW_MARGINS, REDUCED_SAMPLE_RATE, REDUCED_RATE_MINUTES, ONLY_NEW_CLIPS, UPDATE_TIMELINE, MEDIA_FOLDER, SCRATCH_DIR, WARM_ANALYSIS, ANALYSIS_PYTHON
+    """
 
     settings_file = settings_dir / "settings.json"
     # use settings file if it exists
@@ -59,16 +167,7 @@ def load_settings() -> bool:
 
     # save default settings to file
     else:
-        settings = {
-            "L_TRIM_MARGIN": 0.2,
-            "R_TRIM_MARGIN": 0.2,
-            "USE_AUDIO_TRACK": [0],
-            "GATE_DB": -20.0,
-            "HIGHLIGHT_COLOR": "Orange",
-            "HIGHLIGHT_COLOR_INDEX": 0,
-            "DELETE_SILENCE": False,
-            "SKIP_GUI": False,
-        }
+        settings = dict(DEFAULT_SETTINGS)
         with open(settings_file, "w") as f:
             json.dump(settings, f, indent=4)
 
@@ -82,6 +181,27 @@ def load_settings() -> bool:
     global HIGHLIGHT_COLOR_INDEX
     global DELETE_SILENCE
     global SKIP_GUI
+    global ANALYSIS_WORKERS
+    global CACHE_SIZE_MB
+    global ANALYSIS_BACKEND
+    global LOUDNESS_MEASURE
+    global APPEND_CHUNK_SIZE
+    global JOB_QUEUE_DIR
+    global JOB_TIMEOUT
+    global MIN_AUDIBLE_SECONDS
+    global MIN_SILENCE_SECONDS
+    global MAX_SEGMENTS_PER_CLIP
+    global TRACK_GATE_DB
+    global PREVIEW_THRESHOLDS
+    global PREVIEW_MARGINS
+    global REDUCED_SAMPLE_RATE
+    global REDUCED_RATE_MINUTES
+    global ONLY_NEW_CLIPS
+    global UPDATE_TIMELINE
+    global MEDIA_FOLDER
+    global SCRATCH_DIR
+    global WARM_ANALYSIS
+    global ANALYSIS_PYTHON
 
     try:
         L_TRIM_MARGIN = input_to_float(settings["L_TRIM_MARGIN"])
@@ -102,6 +222,63 @@ def load_settings() -> bool:
         print("aborting script...")
         exit()
 
+    # advanced settings are optional so older settings.json files keep working
+    ANALYSIS_WORKERS = settings.get(
+        "ANALYSIS_WORKERS", DEFAULT_SETTINGS["ANALYSIS_WORKERS"]
+    )
+    CACHE_SIZE_MB = settings.get("CACHE_SIZE_MB", DEFAULT_SETTINGS["CACHE_SIZE_MB"])
+    ANALYSIS_BACKEND = settings.get(
+        "ANALYSIS_BACKEND", DEFAULT_SETTINGS["ANALYSIS_BACKEND"]
+    )
+    LOUDNESS_MEASURE = settings.get(
+        "LOUDNESS_MEASURE", DEFAULT_SETTINGS["LOUDNESS_MEASURE"]
+    )
+
+    APPEND_CHUNK_SIZE = settings.get(
+        "APPEND_CHUNK_SIZE", DEFAULT_SETTINGS["APPEND_CHUNK_SIZE"]
+    )
+    JOB_QUEUE_DIR = settings.get("JOB_QUEUE_DIR", DEFAULT_SETTINGS["JOB_QUEUE_DIR"])
+    JOB_TIMEOUT = settings.get("JOB_TIMEOUT", DEFAULT_SETTINGS["JOB_TIMEOUT"])
+    MIN_AUDIBLE_SECONDS = settings.get(
+        "MIN_AUDIBLE_SECONDS", DEFAULT_SETTINGS["MIN_AUDIBLE_SECONDS"]
+    )
+    MIN_SILENCE_SECONDS = settings.get(
+        "MIN_SILENCE_SECONDS", DEFAULT_SETTINGS["MIN_SILENCE_SECONDS"]
+    )
+    MAX_SEGMENTS_PER_CLIP = settings.get(
+        "MAX_SEGMENTS_PER_CLIP", DEFAULT_SETTINGS["MAX_SEGMENTS_PER_CLIP"]
+    )
+    TRACK_GATE_DB = settings.get("TRACK_GATE_DB", DEFAULT_SETTINGS["TRACK_GATE_DB"])
+    PREVIEW_THRESHOLDS = settings.get(
+        "PREVIEW_THRESHOLDS", DEFAULT_SETTINGS["PREVIEW_THRESHOLDS"]
+    )
+    PREVIEW_MARGINS = settings.get(
+        "PREVIEW_MARGINS", DEFAULT_SETTINGS["PREVIEW_MARGINS"]
+    )
+    REDUCED_SAMPLE_RATE = settings.get(
+        "REDUCED_SAMPLE_RATE", DEFAULT_SETTINGS["REDUCED_SAMPLE_RATE"]
+    )
+    REDUCED_RATE_MINUTES = settings.get(
+        "REDUCED_RATE_MINUTES", DEFAULT_SETTINGS["REDUCED_RATE_MINUTES"]
+    )
+    ONLY_NEW_CLIPS = settings.get("ONLY_NEW_CLIPS", DEFAULT_SETTINGS["ONLY_NEW_CLIPS"])
+    UPDATE_TIMELINE = settings.get(
+        "UPDATE_TIMELINE", DEFAULT_SETTINGS["UPDATE_TIMELINE"]
+    )
+    MEDIA_FOLDER = settings.get("MEDIA_FOLDER", DEFAULT_SETTINGS["MEDIA_FOLDER"])
+    SCRATCH_DIR = settings.get("SCRATCH_DIR", DEFAULT_SETTINGS["SCRATCH_DIR"])
+    WARM_ANALYSIS = settings.get("WARM_ANALYSIS", DEFAULT_SETTINGS["WARM_ANALYSIS"])
+    ANALYSIS_PYTHON = settings.get(
+        "ANALYSIS_PYTHON", DEFAULT_SETTINGS["ANALYSIS_PYTHON"]
+    )
+
+    if ANALYSIS_BACKEND not in ("auto-editor", "numpy"):
+        print(f"unknown ANALYSIS_BACKEND '{ANALYSIS_BACKEND}', using auto-editor")
+        ANALYSIS_BACKEND = "auto-editor"
+    if ANALYSIS_BACKEND == "numpy" and np is None:
+        print("numpy is not installed (pip install numpy), using auto-editor backend")
+        ANALYSIS_BACKEND = "auto-editor"
+
     # cleaning memory
     del settings
 
@@ -145,74 +322,189 @@ def ChangeTimecode(timecode: str) -> str:
     return "{:02d}:{:02d}:{:02d}:{:02d}".format(hours, minutes, seconds, frames)
 
 
-def sanitize_resolve_xml(xml_path):
+def frame_duration(fps: float) -> str:
+    """FCPXML frameDuration for `fps`, e.g. "1001/30000s" for 29.97. Rates that look like NTSC are snapped to their exact x/1.001 value."""
+    ntsc = round(fps * 1.001)
+    if abs(fps - ntsc / 1.001) < 0.005:
+        duration = Fraction(1001, ntsc * 1000)
+    else:
+        duration = 1 / Fraction(fps).limit_denominator(1001)
+    return f"{duration.numerator}/{duration.denominator}s"
+
+
+def write_empty_timeline(
+    xml_path: Path, timeline_name: str, fps: float, width: int, height: int
+) -> bool:
     """
-    Removes clips and extra resource information from a Resolve XML file,
-    leaving an empty timeline structure.
+    Writes a minimal FCPXML with an empty sequence in the clip's frame rate and
+    resolution. Resolve only needs this to create the timeline, so there is no
+    analysis run or XML round trip behind it.
     """
+    fcpxml = ET.Element("fcpxml", version="1.10")
+    resources = ET.SubElement(fcpxml, "resources")
+    ET.SubElement(
+        resources,
+        "format",
+        id="r1",
+        frameDuration=frame_duration(fps),
+        width=str(width),
+        height=str(height),
+        colorSpace="1-1-1 (Rec. 709)",
+    )
+    library = ET.SubElement(fcpxml, "library")
+    event = ET.SubElement(library, "event", name=timeline_name)
+    project_element = ET.SubElement(event, "project", name=timeline_name)
+    ET.SubElement(
+        project_element,
+        "sequence",
+        format="r1",
+        tcStart="0s",
+        tcFormat="NDF",
+        audioLayout="stereo",
+        audioRate="48k",
+    )
+
     try:
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-
-        # Find the sequence tag and clear its children
-        sequence = root.find(".//sequence")
-        if sequence is not None:
-            # This is a safe way to remove all children
-            for child in list(sequence):
-                sequence.remove(child)
-
-        # Find the resources tag, keep only the first format tag
-        resources = root.find(".//resources")
-        if resources is not None:
-            first_format_tag = resources.find("format")
-            # Remove all children of <resources>
-            for child in list(resources):
-                resources.remove(child)
-            # Add the first format tag back if it was found
-            if first_format_tag is not None:
-                resources.append(first_format_tag)
-
-        # Write the modified XML back to the file
-        tree.write(xml_path)
-        print("XML sanitization successful.")
-        return True
-    except Exception as e:
-        print(f"ERROR: Failed to parse or modify XML file at {xml_path}: {e}")
+        ET.ElementTree(fcpxml).write(xml_path, encoding="UTF-8", xml_declaration=True)
+    except OSError as e:
+        print(f"ERROR: Failed to write timeline XML at {xml_path}: {e}")
         return False
+    return True
 
 
-def diff_audio_tracks() -> int:
-    """used to check if all video files in `clips` have the same audio track count. Returns audio track count as int."""
-    previous_audio_tracks = None
+def clip_resolution(clip, file_path: Path) -> tuple:
+    """`(width, height)` of a clip as Resolve reports it, falls back to ffprobe and then to 1920x1080."""
+    resolution = str(clip.GetClipProperty("Resolution") or "")
+    width, _, height = resolution.partition("x")
+    if width.isdigit() and height.isdigit():
+        return int(width), int(height)
+
+    probe = probe_media(file_path)
+    if probe and probe["width"] and probe["height"]:
+        return probe["width"], probe["height"]
+    return 1920, 1080
+
+
+def parse_frame_rate(rate: str) -> float:
+    """ffprobe frame rates are fractions like "30000/1001", returns None for "0/0" or garbage."""
+    try:
+        numerator, _, denominator = rate.partition("/")
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError, AttributeError):
+        return None
+
+
+def probe_media(file_path: Path) -> dict:
+    """Runs ffprobe once on `file_path` and returns what the rest of the script needs from it:
+
+    `{"audio_streams": [{"sample_rate", "channels"}, ...], "fps", "width", "height", "duration"}`
+
+    Results are kept in `probe_results` for the rest of the run and cached on disk by path, size and modification time, so later launches skip ffprobe completely. Returns None if ffprobe fails or the file can't be read.
+    """
+    if str(file_path) in probe_results:
+        return probe_results[str(file_path)]
+
+    if CACHE_SIZE_MB:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            # offline or missing, ffprobe would not get anything out of it either
+            return None
+        # no content hash here: on a network share reading it would take longer
+        # than the ffprobe header read it is meant to skip
+        identity = f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}"
+        key = cache_key(identity, {"probe": 1})
+        entry = read_cache_entry(key)
+        if entry is not None:
+            probe_results[str(file_path)] = entry["probe"]
+            return entry["probe"]
+
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "stream=codec_type,sample_rate,channels,r_frame_rate,avg_frame_rate,width,height:format=duration",
+        "-of",
+        "json",
+        str(file_path),
+    ]
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        creationflags=CREATE_NO_WINDOW,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        ffprobe_output = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return None
 
+    probe = {
+        "audio_streams": [],
+        "fps": None,
+        "width": None,
+        "height": None,
+        "duration": None,
+    }
+    for stream in ffprobe_output.get("streams", []):
+        if stream.get("codec_type") == "audio":
+            probe["audio_streams"].append(
+                {
+                    "sample_rate": int(stream.get("sample_rate", 0)),
+                    "channels": int(stream.get("channels", 0)),
+                }
+            )
+        elif stream.get("codec_type") == "video" and probe["fps"] is None:
+            probe["fps"] = parse_frame_rate(
+                stream.get("r_frame_rate")
+            ) or parse_frame_rate(stream.get("avg_frame_rate"))
+            probe["width"] = stream.get("width")
+            probe["height"] = stream.get("height")
+    try:
+        probe["duration"] = float(ffprobe_output["format"]["duration"])
+    except (KeyError, ValueError):
+        pass
+
+    probe_results[str(file_path)] = probe
+    if CACHE_SIZE_MB:
+        write_cache_entry(key, {"probe": probe})
+    return probe
+
+
+def clip_file_paths() -> list:
+    """File paths of the clips in `clips` that have one, read from the Resolve API on the calling thread."""
+    file_paths = []
     for clip in clips:
         file_path = clip.GetClipProperty().get("File Path")
-        if not file_path:
-            continue
+        if file_path:
+            file_paths.append(Path(file_path))
+    return file_paths
 
-        # Run ffprobe to get audio stream information
-        command = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-select_streams",
-            "a",
-            "-show_entries",
-            "stream=index",
-            "-of",
-            "json",
-            file_path,
-        ]
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW,
-        )
-        ffprobe_output = json.loads(result.stdout)
+
+def diff_audio_tracks(file_paths: list, on_probed=None) -> int:
+    """used to check if all video files in `file_paths` have the same audio track count. Returns audio track count as int.
+
+    Files are probed in parallel (see `probe_media()`), the results stay around for the analysis. `on_probed(count)` is called with the number of files probed so far. Does not touch the Resolve API, so it can run on any thread.
+    """
+    previous_audio_tracks = None
+
+    probes = []
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        for probe in executor.map(probe_media, file_paths):
+            probes.append(probe)
+            if on_probed is not None:
+                on_probed(len(probes))
+
+    for file_path, probe in zip(file_paths, probes):
+        if probe is None:
+            print(f"could not probe {file_path.name} with ffprobe, skipping it")
+            continue
 
         # Count the number of audio streams
-        audio_tracks = len(ffprobe_output.get("streams", []))
+        audio_tracks = len(probe["audio_streams"])
 
         # Set previous_audio_tracks on first valid clip
         if previous_audio_tracks is None:
@@ -220,267 +512,3193 @@ def diff_audio_tracks() -> int:
         elif audio_tracks != previous_audio_tracks:
             return None
 
-    return previous_audio_tracks
+    return previous_audio_tracks
+
+
+def probe_in_background(file_paths: list) -> dict:
+    """Runs `diff_audio_tracks()` on a background thread so the GUI can open right away. Returns the progress the GUI polls: `{"probed", "total", "audio_track_count", "finished", "thread"}`."""
+    probe_progress = {
+        "probed": 0,
+        "total": len(file_paths),
+        "audio_track_count": None,
+        "finished": False,
+    }
+
+    def on_probed(probed: int):
+        probe_progress["probed"] = probed
+
+    def run():
+        try:
+            with timed("probe"):
+                probe_progress["audio_track_count"] = diff_audio_tracks(
+                    file_paths, on_probed
+                )
+        finally:
+            probe_progress["finished"] = True
+
+    probe_progress["thread"] = threading.Thread(target=run, daemon=True)
+    probe_progress["thread"].start()
+    return probe_progress
+
+
+def selected_tracks_available(audio_track_count: int) -> bool:
+    """True when at least one audio track is selected and all of them exist on clips with `audio_track_count` tracks. Tracks are counted from 0, so track `audio_track_count` is already one too many."""
+    return bool(USE_AUDIO_TRACKS) and max(USE_AUDIO_TRACKS) < audio_track_count
+
+
+def construct_checkboxes(audio_tracks: int):
+    """Constructs the checkboxes in the GUI for the count of audio tracks"""
+    checkbox_group = []
+
+    for track in range(audio_tracks):
+        checkbox = ui.CheckBox(
+            {
+                "ID": f"checkbox_{track}",
+                "Text": f"Track {track + 1}",
+                "Checked": True if track in USE_AUDIO_TRACKS else False,
+            }
+        )
+        checkbox_group.append(checkbox)
+
+    return checkbox_group
+
+
+def load_v1_chunks(v1_path: Path) -> list:
+    """Reads an auto-editor v1 timeline and returns its chunks as `(start_frame, end_frame, is_audible)` tuples. Returns None if the file is missing or broken.
+
+    v1 keeps every chunk with the speed auto-editor gave it, so one export holds both the full segment list and the audible subset. Silent chunks carry the cut speed (99999).
+    """
+    try:
+        with open(v1_path, "r") as f:
+            v1_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error reading JSON file: {e}")
+        return None
+
+    chunks = []
+    for start_frame, end_frame, speed in v1_data.get("chunks", []):
+        is_audible = 0 < speed < SILENT_SPEED
+        chunks.append((int(start_frame), int(end_frame), is_audible))
+    return chunks
+
+
+# --
+# -- Scratch folder
+# --
+def scratch_path(name: str) -> Path:
+    """
+    Path for the intermediate file `name` in this run's scratch folder. The folder
+    is made on first use below SCRATCH_DIR (the system temp folder by default), so
+    auto-editor output and the timeline XML never land next to the media, which
+    may sit on a slow network share. It goes away again with cleanup_scratch().
+    """
+    with scratch_lock:
+        if scratch["dir"] is None:
+            base = Path(SCRATCH_DIR) if SCRATCH_DIR else Path(tempfile.gettempdir())
+            base.mkdir(parents=True, exist_ok=True)
+            remove_stale_scratch(base)
+            scratch["dir"] = Path(
+                tempfile.mkdtemp(prefix="auto-silence-cut-", dir=base)
+            )
+            scratch["stop_touching"] = keep_scratch_fresh(scratch["dir"])
+        return scratch["dir"] / name
+
+
+def keep_scratch_fresh(folder: Path) -> threading.Event:
+    """
+    Touches `folder` every SCRATCH_TOUCH_INTERVAL for as long as this process lives,
+    so `remove_stale_scratch()` of another run leaves it alone however long a worker
+    or analysis helper runs. Set the returned event to stop.
+    """
+    stop = threading.Event()
+
+    def touch():
+        while not stop.wait(SCRATCH_TOUCH_INTERVAL):
+            try:
+                os.utime(folder)
+            except OSError:
+                return
+
+    threading.Thread(target=touch, daemon=True).start()
+    return stop
+
+
+def remove_stale_scratch(base: Path):
+    """Removes scratch folders in `base` that a killed run could not clean up. Folders of live runs are touched by `keep_scratch_fresh()` and stay."""
+    now = time.time()
+    for folder in base.glob("auto-silence-cut-*"):
+        try:
+            if folder.is_dir() and now - folder.stat().st_mtime > SCRATCH_MAX_AGE:
+                shutil.rmtree(folder, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def cleanup_scratch():
+    """Removes this run's scratch folder and everything left in it."""
+    with scratch_lock:
+        if scratch["dir"] is not None:
+            scratch["stop_touching"].set()
+            shutil.rmtree(scratch["dir"], ignore_errors=True)
+            scratch.update(dir=None, stop_touching=None)
+
+
+def remove_scratch_file(path: Path):
+    """Removes one intermediate file as soon as it was read, so long runs do not pile them up."""
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+# --
+# -- Analysis cache
+# --
+def file_fingerprint(file_path: Path) -> str:
+    """Fast identity of a media file: size, mtime and a hash of its first and last `FINGERPRINT_BYTES`. Reading the whole file would cost as much as analyzing it.
+
+    Kept in `fingerprint_results` by path, size and mtime, so a clip is only read once however many steps of the run need its fingerprint.
+    """
+    stat = file_path.stat()
+    identity = (str(file_path), stat.st_size, stat.st_mtime_ns)
+    if identity in fingerprint_results:
+        return fingerprint_results[identity]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(file_path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if stat.st_size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, stat.st_size - FINGERPRINT_BYTES))
+            digest.update(f.read(FINGERPRINT_BYTES))
+    fingerprint_results[identity] = digest.hexdigest()
+    return fingerprint_results[identity]
+
+
+def detection_params() -> dict:
+    """The settings that change the analysis result, everything else (colors, delete silence...) only changes how it is put on the timeline."""
+    params = {
+        "GATE_DB": GATE_DB,
+        "USE_AUDIO_TRACK": list(USE_AUDIO_TRACKS),
+        "L_TRIM_MARGIN": L_TRIM_MARGIN,
+        "R_TRIM_MARGIN": R_TRIM_MARGIN,
+        "ANALYSIS_BACKEND": ANALYSIS_BACKEND,
+        "LOUDNESS_MEASURE": LOUDNESS_MEASURE,
+    }
+    # only the selected tracks matter, and without any the keys of older results stay valid
+    track_gates = {
+        str(stream): TRACK_GATE_DB[str(stream)]
+        for stream in USE_AUDIO_TRACKS
+        if str(stream) in TRACK_GATE_DB
+    }
+    if track_gates:
+        params["TRACK_GATE_DB"] = track_gates
+    if ANALYSIS_BACKEND == "numpy" and REDUCED_SAMPLE_RATE:
+        params["REDUCED_SAMPLE_RATE"] = REDUCED_SAMPLE_RATE
+        params["REDUCED_RATE_MINUTES"] = REDUCED_RATE_MINUTES
+    return params
+
+
+def chunk_params(fps: float, total_frames: int) -> dict:
+    """`detection_params()` plus the frame grid the chunks of a clip are on, what its cache entry is keyed by. The same file in a project with another frame rate gets its own chunks instead of ones on the wrong frames."""
+    params = detection_params()
+    params["fps"] = round(exact_fps(fps), 6)
+    params["total_frames"] = total_frames
+    return params
+
+
+def cache_key(fingerprint: str, params: dict) -> str:
+    """Cache file name for a file fingerprint analyzed with `params`."""
+    key = json.dumps({"fingerprint": fingerprint, "params": params}, sort_keys=True)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def read_cache_entry(key: str) -> dict:
+    """Returns the cache entry stored under `key` or None on a miss. A hit refreshes the entry's mtime, which is what the LRU eviction goes by."""
+    cache_file = settings_dir / "cache" / f"{key}.json"
+    try:
+        with open(cache_file, "r") as f:
+            entry = json.load(f)
+        os.utime(cache_file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return entry
+
+
+def write_cache_entry(key: str, entry: dict):
+    """Stores `entry` under `key`. Written to a temp file first so a crash or a parallel worker never leaves half a cache entry behind."""
+    cache_dir = settings_dir / "cache"
+    cache_dir.mkdir(exist_ok=True)
+    tmp_file = cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp_file, cache_dir / f"{key}.json")
+
+
+def read_cache(key: str) -> list:
+    """Returns the cached chunks for `key` or None on a miss."""
+    entry = read_cache_entry(key)
+    if entry is None:
+        return None
+    return [(start, end, is_audible) for start, end, is_audible in entry["chunks"]]
+
+
+def write_cache(key: str, fingerprint: str, params: dict, chunks: list):
+    """Stores the `chunks` of a file analyzed with `params` under `key`."""
+    entry = {"fingerprint": fingerprint, "params": params, "chunks": chunks}
+    write_cache_entry(key, entry)
+
+
+def evict_cache():
+    """Deletes the least recently used cache entries until the cache fits in `CACHE_SIZE_MB`."""
+    cache_dir = settings_dir / "cache"
+    if not cache_dir.exists():
+        return
+
+    entries = []
+    for cache_file in [*cache_dir.glob("*.json"), *cache_dir.glob("*.npy")]:
+        stat = cache_file.stat()
+        entries.append((stat.st_mtime, stat.st_size, cache_file))
+
+    total_size = sum(size for _, size, _ in entries)
+    limit = CACHE_SIZE_MB * 1024 * 1024
+    # oldest first
+    for _, size, cache_file in sorted(entries):
+        if total_size <= limit:
+            break
+        try:
+            cache_file.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # windows refuses to delete an envelope that is still memory-mapped
+            continue
+        total_size -= size
+
+
+# --
+# -- Segments
+# --
+class Segments:
+    """The chunks of one clip as parallel `starts`, `ends` (source frames, end exclusive) and `audible` (1/0) arrays, sorted and not overlapping.
+
+    Much smaller than a list of tuples for clips with tens of thousands of cuts. The interval operations are vectorized with numpy when it is installed and use plain loops and `bisect` on stdlib arrays otherwise.
+    """
+
+    __slots__ = ("starts", "ends", "audible")
+
+    def __init__(self, starts, ends, audible):
+        if np is not None:
+            self.starts = np.asarray(starts, dtype=np.int64)
+            self.ends = np.asarray(ends, dtype=np.int64)
+            self.audible = np.asarray(audible, dtype=np.int8)
+        else:
+            self.starts = array("q", starts)
+            self.ends = array("q", ends)
+            self.audible = array("b", audible)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "Segments":
+        """From `(start_frame, end_frame, is_audible)` chunks (see `load_v1_chunks()`), Segments are returned as they are."""
+        if isinstance(chunks, cls):
+            return chunks
+        return cls(
+            [chunk[0] for chunk in chunks],
+            [chunk[1] for chunk in chunks],
+            [bool(chunk[2]) for chunk in chunks],
+        )
+
+    @classmethod
+    def from_runs(cls, run_starts, run_ends, total_frames: int) -> "Segments":
+        """Segments covering `0..total_frames` from sorted, non-overlapping audible runs, the gaps between them become the silent segments."""
+        if np is not None:
+            runs = len(run_starts)
+            bounds = np.empty(2 * runs + 2, dtype=np.int64)
+            bounds[0] = 0
+            bounds[1:-1:2] = run_starts
+            bounds[2:-1:2] = run_ends
+            bounds[-1] = total_frames
+            audible = np.zeros(2 * runs + 1, dtype=np.int8)
+            audible[1::2] = 1
+            starts, ends = bounds[:-1], bounds[1:]
+            keep = ends > starts
+            return cls(starts[keep], ends[keep], audible[keep])
+
+        starts, ends, audible = [], [], []
+        position = 0
+        for start_frame, end_frame in zip(run_starts, run_ends):
+            if start_frame > position:
+                starts.append(position)
+                ends.append(start_frame)
+                audible.append(0)
+            starts.append(start_frame)
+            ends.append(end_frame)
+            audible.append(1)
+            position = end_frame
+        if position < total_frames:
+            starts.append(position)
+            ends.append(total_frames)
+            audible.append(0)
+        return cls(starts, ends, audible)
+
+    def audible_count(self) -> int:
+        return self.audible.tolist().count(1)
+
+    def to_chunks(self) -> list:
+        """Back to `(start_frame, end_frame, is_audible)` chunks."""
+        return list(
+            zip(
+                self.starts.tolist(),
+                self.ends.tolist(),
+                map(bool, self.audible.tolist()),
+            )
+        )
+
+    def consolidated(self) -> "Segments":
+        """Merges neighbouring segments that touch and are both audible or both silent."""
+        if len(self) < 2:
+            return self
+        if np is not None:
+            first = np.ones(len(self), dtype=bool)
+            first[1:] = (self.audible[1:] != self.audible[:-1]) | (
+                self.starts[1:] != self.ends[:-1]
+            )
+            firsts = np.flatnonzero(first)
+            lasts = np.append(firsts[1:] - 1, len(self) - 1)
+            return Segments(self.starts[firsts], self.ends[lasts], self.audible[firsts])
+
+        starts, ends, audible = [self.starts[0]], [self.ends[0]], [self.audible[0]]
+        for start_frame, end_frame, flag in zip(
+            self.starts[1:], self.ends[1:], self.audible[1:]
+        ):
+            if flag == audible[-1] and start_frame == ends[-1]:
+                ends[-1] = end_frame
+            else:
+                starts.append(start_frame)
+                ends.append(end_frame)
+                audible.append(flag)
+        return Segments(starts, ends, audible)
+
+    def audible_runs(self) -> tuple:
+        """`(starts, ends)` of the audible stretches, neighbouring audible segments joined."""
+        segments = self.consolidated()
+        if np is not None:
+            loud = segments.audible == 1
+            return segments.starts[loud], segments.ends[loud]
+        runs = [
+            (start_frame, end_frame)
+            for start_frame, end_frame, flag in zip(
+                segments.starts, segments.ends, segments.audible
+            )
+            if flag
+        ]
+        return [run[0] for run in runs], [run[1] for run in runs]
+
+    def padded(
+        self, l_margin_frames: int, r_margin_frames: int, total_frames: int
+    ) -> "Segments":
+        """Grows every audible run by `l_margin_frames` before and `r_margin_frames` after it (negative margins shrink it), runs that touch or overlap afterwards are merged."""
+        run_starts, run_ends = self.audible_runs()
+        if np is not None:
+            starts = np.maximum(run_starts - l_margin_frames, 0)
+            ends = np.minimum(run_ends + r_margin_frames, total_frames)
+            valid = ends > starts
+            starts, ends = starts[valid], ends[valid]
+            if len(starts):
+                # a run starting before the furthest end so far belongs to that run
+                reach = np.maximum.accumulate(ends)
+                new_run = np.ones(len(starts), dtype=bool)
+                new_run[1:] = starts[1:] > reach[:-1]
+                starts = starts[new_run]
+                ends = reach[np.append(np.flatnonzero(new_run)[1:] - 1, len(reach) - 1)]
+            return Segments.from_runs(starts, ends, total_frames)
+
+        starts, ends = [], []
+        for start_frame, end_frame in zip(run_starts, run_ends):
+            start_frame = max(start_frame - l_margin_frames, 0)
+            end_frame = min(end_frame + r_margin_frames, total_frames)
+            if end_frame <= start_frame:
+                continue
+            if ends and start_frame <= ends[-1]:
+                ends[-1] = max(ends[-1], end_frame)
+            else:
+                starts.append(start_frame)
+                ends.append(end_frame)
+        return Segments.from_runs(starts, ends, total_frames)
+
+    def simplified(
+        self, min_audible_frames: int, min_silence_frames: int, max_segments: int
+    ) -> "Segments":
+        """Cuts down the number of segments: pauses between audible runs shorter than `min_silence_frames` are filled, then audible runs shorter than `min_audible_frames` become silence. With `max_segments` the shortest remaining pauses are filled until the clip fits (at least 3 segments are always allowed). 0 turns each step off."""
+        if not len(self):
+            return self
+        total_frames = int(self.ends[-1])
+        starts, ends = self.audible_runs()
+        if np is not None:
+
+            def fill_gaps(starts, ends, fill):
+                # a run continues over every filled gap
+                return starts[np.append(True, ~fill)], ends[np.append(~fill, True)]
+
+            if min_silence_frames and len(starts) > 1:
+                starts, ends = fill_gaps(
+                    starts, ends, starts[1:] - ends[:-1] < min_silence_frames
+                )
+            if min_audible_frames:
+                long_enough = ends - starts >= min_audible_frames
+                starts, ends = starts[long_enough], ends[long_enough]
+            # every run can bring a pause before it plus the silence at the end
+            max_runs = max(1, (max_segments - 1) // 2)
+            if max_segments and len(starts) > max_runs:
+                fill = np.zeros(len(starts) - 1, dtype=bool)
+                shortest = np.argsort(starts[1:] - ends[:-1], kind="stable")
+                fill[shortest[: len(starts) - max_runs]] = True
+                starts, ends = fill_gaps(starts, ends, fill)
+            return Segments.from_runs(starts, ends, total_frames)
+
+        def fill_gaps(starts, ends, fill):
+            merged_starts, merged_ends = [starts[0]], [ends[0]]
+            for start_frame, end_frame, filled in zip(starts[1:], ends[1:], fill):
+                if filled:
+                    merged_ends[-1] = end_frame
+                else:
+                    merged_starts.append(start_frame)
+                    merged_ends.append(end_frame)
+            return merged_starts, merged_ends
+
+        if min_silence_frames and len(starts) > 1:
+            starts, ends = fill_gaps(
+                starts,
+                ends,
+                [
+                    start_frame - end_frame < min_silence_frames
+                    for start_frame, end_frame in zip(starts[1:], ends[:-1])
+                ],
+            )
+        if min_audible_frames:
+            runs = [
+                (start_frame, end_frame)
+                for start_frame, end_frame in zip(starts, ends)
+                if end_frame - start_frame >= min_audible_frames
+            ]
+            starts = [run[0] for run in runs]
+            ends = [run[1] for run in runs]
+        max_runs = max(1, (max_segments - 1) // 2)
+        if max_segments and len(starts) > max_runs:
+            gaps = [
+                start_frame - end_frame
+                for start_frame, end_frame in zip(starts[1:], ends[:-1])
+            ]
+            shortest = sorted(range(len(gaps)), key=gaps.__getitem__)
+            fill = [False] * len(gaps)
+            for i in shortest[: len(starts) - max_runs]:
+                fill[i] = True
+            starts, ends = fill_gaps(starts, ends, fill)
+        return Segments.from_runs(starts, ends, total_frames)
+
+    def audible_at(self, frames) -> list:
+        """Whether each of the source `frames` falls into an audible segment, found by binary search on `starts`."""
+        if np is not None:
+            frames = np.asarray(frames, dtype=np.int64)
+            if not len(self):
+                return np.zeros(len(frames), dtype=bool)
+            index = np.searchsorted(self.starts, frames, side="right") - 1
+            inside = index >= 0
+            index = np.maximum(index, 0)
+            return inside & (frames < self.ends[index]) & (self.audible[index] == 1)
+
+        result = []
+        for frame in frames:
+            index = bisect.bisect_right(self.starts, frame) - 1
+            result.append(
+                index >= 0 and frame < self.ends[index] and self.audible[index] == 1
+            )
+        return result
+
+    def merge(self, other: "Segments") -> "Segments":
+        """Audible wherever `self` or `other` is audible."""
+        return self._combine(other, operator.or_)
+
+    def intersect(self, other: "Segments") -> "Segments":
+        """Audible only where `self` and `other` are both audible."""
+        return self._combine(other, operator.and_)
+
+    def _combine(self, other: "Segments", operation) -> "Segments":
+        # cut both at every boundary either one has, then decide each piece on its own
+        if np is not None:
+            bounds = np.union1d(
+                np.concatenate((self.starts, self.ends)),
+                np.concatenate((other.starts, other.ends)),
+            )
+            starts, ends = bounds[:-1], bounds[1:]
+            ours, theirs = self.audible_at(starts), other.audible_at(starts)
+            audible = operation(ours, theirs)
+            return Segments(starts, ends, audible).consolidated()
+
+        bounds = sorted(
+            set(self.starts) | set(self.ends) | set(other.starts) | set(other.ends)
+        )
+        starts, ends = bounds[:-1], bounds[1:]
+        audible = [
+            operation(ours, theirs)
+            for ours, theirs in zip(self.audible_at(starts), other.audible_at(starts))
+        ]
+        return Segments(starts, ends, audible).consolidated()
+
+
+# --
+# -- Built-in loudness engine (numpy backend)
+# --
+def exact_fps(fps: float) -> float:
+    """Resolve reports NTSC rates rounded (29.97, 59.94...), returns the exact x/1.001 rate so frame boundaries dont drift on long clips."""
+    ntsc = round(fps * 1.001)
+    if abs(fps - ntsc / 1.001) < 0.005:
+        return ntsc / 1.001
+    return fps
+
+
+def probe_audio_stream(file_path: Path, stream: int) -> tuple:
+    """Returns `(sample_rate, channels)` of audio stream `stream` from `probe_media()`, or None if the stream does not exist."""
+    probe = probe_media(file_path)
+    if probe is None or stream >= len(probe["audio_streams"]):
+        return None
+    stream_info = probe["audio_streams"][stream]
+    return stream_info["sample_rate"], stream_info["channels"]
+
+
+def decode_sample_rate(file_path: Path) -> int:
+    """Sample rate the numpy backend decodes `file_path` at: `REDUCED_SAMPLE_RATE` for clips of at least `REDUCED_RATE_MINUTES`, 0 (the source rate) for everything shorter."""
+    if not REDUCED_SAMPLE_RATE:
+        return 0
+    probe = probe_media(file_path)
+    if probe is None or (probe["duration"] or 0) < REDUCED_RATE_MINUTES * 60:
+        return 0
+    return REDUCED_SAMPLE_RATE
+
+
+def iter_frame_loudness_db(
+    file_path: Path,
+    streams: list,
+    fps: float,
+    measure: str = "peak",
+    reduced_rate: int = 0,
+):
+    """Decodes the audio `streams` with a single ffmpeg process and yields their loudness per video frame in dBFS (peak or rms), one `(len(streams), frames)` block at a time. Raises RuntimeError if a stream can not be decoded.
+
+    PCM is read from the pipe in `PCM_READ_BYTES` blocks and reduced to frame levels right away, so memory use does not depend on the clip length. With a `reduced_rate` ffmpeg resamples every stream to that rate first, which leaves a fraction of the samples to pipe and reduce. The channels are not downmixed: averaging them drops a mic that is only on one channel by 6 dB, the per-frame max below keeps it where it was.
+    """
+    stream_infos = [probe_audio_stream(file_path, stream) for stream in streams]
+    for stream, stream_info in zip(streams, stream_infos):
+        if stream_info is None:
+            raise RuntimeError(f"{file_path.name} has no audio stream {stream}")
+
+    sample_rate = max(stream_info[0] for stream_info in stream_infos)
+    if reduced_rate:
+        sample_rate = min(reduced_rate, sample_rate)
+
+    if len(streams) == 1 and not reduced_rate:
+        source = ["-map", f"0:a:{streams[0]}"]
+    else:
+        # one read of the container for every track: bring them to one sample rate and merge
+        # them into a single multi-channel stream, the channels are split up again below.
+        # padding to the container length keeps amerge from stopping at the shortest track
+        graph = []
+        for i, stream in enumerate(streams):
+            filters = []
+            if reduced_rate:
+                # a short resampling filter is plenty for frame levels and a lot cheaper
+                filters.append(f"aresample={sample_rate}:filter_size=8")
+            filters.append(f"aformat=sample_fmts=flt:sample_rates={sample_rate}")
+            if len(streams) > 1:
+                duration = probe_media(file_path)["duration"]
+                if duration:
+                    filters.append(f"apad=whole_dur={duration}")
+            graph.append(f"[0:a:{stream}]{','.join(filters)}[s{i}]")
+        if len(streams) > 1:
+            inputs = "".join(f"[s{i}]" for i in range(len(streams)))
+            graph.append(f"{inputs}amerge=inputs={len(streams)}[merged]")
+            output = "[merged]"
+        else:
+            output = "[s0]"
+        source = ["-filter_complex", ";".join(graph), "-map", output]
+
+    command = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-nostdin",
+        "-i",
+        str(file_path),
+        *source,
+        "-f",
+        "f32le",
+        "-acodec",
+        "pcm_f32le",
+        "pipe:1",
+    ]
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        creationflags=CREATE_NO_WINDOW,
+    )
+
+    # channels of each stream in the merged samples
+    channel_bounds = np.cumsum([0] + [stream_info[1] for stream_info in stream_infos])
+    channels = int(channel_bounds[-1])
+    samples_per_frame = sample_rate / fps
+    sample_bytes = 4 * channels
+    leftover = b""
+    # per channel sample levels (peak: abs, rms: square), one row per channel so the
+    # reductions below run over contiguous memory
+    pending = np.empty((channels, 0), dtype=np.float32)
+    pending_start = 0  # sample index of pending[:, 0]
+    next_frame = 0
+
+    try:
+        while True:
+            raw = process.stdout.read(PCM_READ_BYTES)
+            finished = not raw
+
+            if raw:
+                raw = leftover + raw
+                usable = len(raw) - len(raw) % sample_bytes
+                leftover = raw[usable:]
+                samples = np.frombuffer(raw[:usable], dtype=np.float32)
+                samples = samples.reshape(-1, channels).T
+                if measure == "rms":
+                    sample_levels = np.square(samples)
+                else:
+                    sample_levels = np.abs(samples)
+                pending = np.concatenate((pending, sample_levels), axis=1)
+
+            end_sample = pending_start + pending.shape[1]
+            if finished:
+                # the last (partial) frame counts too, it ends at the last sample
+                last_frame = int(np.ceil(end_sample / samples_per_frame))
+                while (
+                    last_frame > next_frame
+                    and round((last_frame - 1) * samples_per_frame) >= end_sample
+                ):
+                    last_frame -= 1
+            else:
+                last_frame = int(end_sample // samples_per_frame)
+                while round(last_frame * samples_per_frame) > end_sample:
+                    last_frame -= 1
+
+            if last_frame > next_frame:
+                bounds = np.round(
+                    np.arange(next_frame, last_frame + 1) * samples_per_frame
+                ).astype(np.int64)
+                bounds[-1] = min(bounds[-1], end_sample)
+                bounds -= pending_start
+                # reduce every channel per frame first, then the few channels of each stream
+                if measure == "rms":
+                    sums = np.add.reduceat(
+                        pending[:, : bounds[-1]], bounds[:-1], axis=1
+                    )
+                    sums = np.add.reduceat(sums, channel_bounds[:-1], axis=0)
+                    counts = np.outer(np.diff(channel_bounds), np.diff(bounds))
+                    frame_levels = np.sqrt(sums / counts)
+                else:
+                    frame_levels = np.maximum.reduceat(
+                        pending[:, : bounds[-1]], bounds[:-1], axis=1
+                    )
+                    frame_levels = np.maximum.reduceat(
+                        frame_levels, channel_bounds[:-1], axis=0
+                    )
+                pending = pending[:, bounds[-1] :]
+                pending_start += int(bounds[-1])
+                next_frame = last_frame
+                yield (20 * np.log10(np.maximum(frame_levels, 1e-10))).astype(
+                    np.float32
+                )
+
+            if finished:
+                break
+
+        process.wait()
+        if process.returncode != 0 or next_frame == 0:
+            raise RuntimeError(
+                f"ffmpeg could not decode audio stream(s) {', '.join(map(str, streams))} of {file_path.name}"
+            )
+    finally:
+        # stops ffmpeg when the caller gives up early
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def chunks_from_loudness(
+    loudness_db: "np.ndarray",
+    gate_db: float,
+    l_margin_frames: int,
+    r_margin_frames: int,
+    total_frames: int,
+) -> list:
+    """Thresholds a per-frame loudness curve and returns `(start_frame, end_frame, is_audible)` chunks covering the whole clip, same format as `load_v1_chunks()`.
+
+    Margins are applied as a dilation of the loud runs (negative margins shrink them), runs that end up overlapping are merged.
+    """
+    loud = np.zeros(total_frames, dtype=bool)
+    usable = min(total_frames, len(loudness_db))
+    loud[:usable] = loudness_db[:usable] > gate_db
+
+    # run edges of the loud mask
+    edges = np.flatnonzero(np.diff(loud.astype(np.int8), prepend=0, append=0))
+    segments = Segments.from_runs(edges[0::2], edges[1::2], total_frames)
+    return segments.padded(l_margin_frames, r_margin_frames, total_frames).to_chunks()
+
+
+def stream_chunks(
+    loudness_blocks,
+    gate_db: float,
+    l_margin_frames: int,
+    r_margin_frames: int,
+    total_frames: int,
+):
+    """Streaming version of `chunks_from_loudness()`: takes the loudness curve as consecutive blocks and yields the same chunks as soon as they are final.
+
+    Only the loud run that is still open at the end of a block and the last padded run (which the next run could still merge into) are carried over, so memory stays flat no matter how long the clip is.
+    """
+    position = 0  # frames seen so far
+    run_start = (
+        None  # start of the raw loud run still open at the end of the last block
+    )
+    pending = None  # padded loud run that can still merge with the next one
+    emitted = 0  # everything before this frame has been yielded
+
+    def flush() -> list:
+        nonlocal pending, emitted
+        if pending is None:
+            return []
+        ready = []
+        if pending[0] > emitted:
+            ready.append((emitted, pending[0], False))
+        ready.append((pending[0], pending[1], True))
+        emitted = pending[1]
+        pending = None
+        return ready
+
+    def add_run(start: int, end: int) -> list:
+        nonlocal pending
+        start = max(start - l_margin_frames, 0)
+        end = min(end + r_margin_frames, total_frames)
+        if end <= start:
+            return []
+        if pending is not None and start <= pending[1]:
+            pending = (pending[0], max(pending[1], end))
+            return []
+        ready = flush()
+        pending = (start, end)
+        return ready
+
+    for block in loudness_blocks:
+        # audio running longer than the video is ignored
+        block = block[: max(total_frames - position, 0)]
+        if not len(block):
+            continue
+
+        loud = block > gate_db
+        edges = np.flatnonzero(
+            np.diff(loud.astype(np.int8), prepend=int(run_start is not None))
+        )
+        for index in edges.tolist():
+            if loud[index]:
+                run_start = position + index
+            else:
+                yield from add_run(run_start, position + index)
+                run_start = None
+        position += len(block)
+
+        # no later run can reach the pending one anymore
+        next_start = run_start if run_start is not None else position
+        if pending is not None and next_start - l_margin_frames > pending[1]:
+            yield from flush()
+
+    if run_start is not None:
+        yield from add_run(run_start, position)
+    yield from flush()
+    if emitted < total_frames:
+        yield (emitted, total_frames, False)
+
+
+def envelope_file_for(
+    fingerprint: str, stream: int, fps: float, reduced_rate: int = 0
+) -> Path:
+    """Cache file of the loudness envelope of one audio stream. Keyed by file fingerprint, stream, fps, `LOUDNESS_MEASURE` and the reduced decode rate but not by threshold or margins, so it survives any change to those."""
+    envelope_params = {
+        "stream": stream,
+        "fps": round(fps, 6),
+        "measure": LOUDNESS_MEASURE,
+    }
+    if reduced_rate:
+        envelope_params["reduced_rate"] = reduced_rate
+    return settings_dir / "cache" / f"{cache_key(fingerprint, envelope_params)}.npy"
+
+
+def load_envelope(
+    fingerprint: str, stream: int, fps: float, reduced_rate: int = 0
+) -> "np.ndarray":
+    """Memory-maps a cached loudness envelope, returns None if there is none."""
+    envelope_file = envelope_file_for(fingerprint, stream, fps, reduced_rate)
+    try:
+        loudness_db = np.load(envelope_file, mmap_mode="r")
+        os.utime(envelope_file)
+        return loudness_db
+    except (OSError, ValueError):
+        return None
+
+
+def iter_envelopes(
+    file_path: Path,
+    streams: list,
+    fps: float,
+    fingerprint: str,
+    reduced_rate: int = 0,
+):
+    """Decodes the loudness envelopes of `streams` in one pass (see `iter_frame_loudness_db()`) and yields them block by block. With a `fingerprint` each stream's envelope is written to the cache as it goes, so changing only thresholds or trim margins later needs no decoding."""
+    envelope_files = []
+    if fingerprint is not None:
+        envelope_files = [
+            envelope_file_for(fingerprint, stream, fps, reduced_rate)
+            for stream in streams
+        ]
+    blocks = iter_frame_loudness_db(
+        file_path, streams, fps, LOUDNESS_MEASURE, reduced_rate
+    )
+    try:
+        yield from write_envelopes(blocks, envelope_files)
+    finally:
+        # stops ffmpeg right away when the caller gives up early
+        blocks.close()
+
+
+def write_envelopes(blocks, envelope_files: list):
+    """Passes the `(streams, frames)` loudness `blocks` through and writes row i of every block to `envelope_files[i]` on the way. Nothing but the current block is held in memory, the files only appear once the last block went through."""
+    tmp_files = []
+    for envelope_file in envelope_files:
+        envelope_file.parent.mkdir(exist_ok=True)
+        tmp_file = open(
+            envelope_file.with_name(
+                f"{envelope_file.stem}.{os.getpid()}.{threading.get_ident()}.tmp"
+            ),
+            "wb",
+        )
+        # the .npy header of a 1d float32 array is always 128 bytes, so it can be
+        # written now and patched with the real length once the decode is done
+        np.lib.format.write_array_header_1_0(tmp_file, npy_header(0))
+        tmp_files.append(tmp_file)
+
+    frames = 0
+    try:
+        for block in blocks:
+            for tmp_file, levels in zip(tmp_files, block):
+                tmp_file.write(levels.astype("<f4").tobytes())
+            frames += block.shape[1]
+            yield block
+
+        for tmp_file, envelope_file in zip(tmp_files, envelope_files):
+            tmp_file.seek(0)
+            np.lib.format.write_array_header_1_0(tmp_file, npy_header(frames))
+            tmp_file.close()
+            os.replace(tmp_file.name, envelope_file)
+    finally:
+        for tmp_file in tmp_files:
+            if not tmp_file.closed:
+                # decode failed or was abandoned, dont leave half an envelope behind
+                tmp_file.close()
+                try:
+                    Path(tmp_file.name).unlink()
+                except FileNotFoundError:
+                    pass
+
+
+def npy_header(frames: int) -> dict:
+    """.npy header of a loudness envelope with `frames` frames."""
+    return {"descr": "<f4", "fortran_order": False, "shape": (frames,)}
+
+
+def track_gate_db(stream: int) -> float:
+    """Threshold of one audio track, `TRACK_GATE_DB` if it has one there, `GATE_DB` otherwise."""
+    return TRACK_GATE_DB.get(str(stream), GATE_DB)
+
+
+def track_shifts() -> "np.ndarray":
+    """How far each selected track's loudness is moved so its `track_gate_db()` lines up with `GATE_DB`.
+
+    A frame is loud if any track is above its own threshold, after the shift that OR is simply the per-frame max compared against `GATE_DB`.
+    """
+    return np.array(
+        [GATE_DB - track_gate_db(stream) for stream in USE_AUDIO_TRACKS],
+        dtype=np.float32,
+    )
+
+
+def cached_loudness(
+    fingerprint: str, fps: float, reduced_rate: int = 0
+) -> "np.ndarray":
+    """The combined loudness curve of the selected tracks (see `track_shifts()`) built from the envelope cache, or None if one of them is not cached."""
+    envelopes = [
+        load_envelope(fingerprint, s, fps, reduced_rate) for s in USE_AUDIO_TRACKS
+    ]
+    if any(envelope is None for envelope in envelopes):
+        return None
+    usable = min(len(envelope) for envelope in envelopes)
+    return np.maximum.reduce(
+        [
+            envelope[:usable] + shift
+            for envelope, shift in zip(envelopes, track_shifts())
+        ]
+    )
+
+
+def numpy_analyze(
+    file_path: Path, fps: float, total_frames: int, fingerprint: str = None
+) -> list:
+    """Built-in alternative to auto-editor: frame loudness of every selected track, each thresholded at its `track_gate_db()`, OR'ed together and padded by the trim margins. Returns chunks or None on failure.
+
+    All tracks are decoded together in a single pass and segmented as a stream (see `stream_chunks()`), so memory stays flat even for multi-hour recordings. With a `fingerprint` the loudness envelopes are cached, and when all of them are cached the chunks are rebuilt from the memory-mapped curves in one vectorized pass.
+    """
+    fps = exact_fps(fps)
+    l_margin_frames = round(L_TRIM_MARGIN * fps)
+    r_margin_frames = round(R_TRIM_MARGIN * fps)
+    shifts = track_shifts()
+    reduced_rate = decode_sample_rate(file_path)
+
+    if fingerprint is not None:
+        loudest = cached_loudness(fingerprint, fps, reduced_rate)
+        if loudest is not None:
+            return chunks_from_loudness(
+                loudest, GATE_DB, l_margin_frames, r_margin_frames, total_frames
+            )
+
+    blocks = iter_envelopes(file_path, USE_AUDIO_TRACKS, fps, fingerprint, reduced_rate)
+    try:
+        return list(
+            stream_chunks(
+                ((block + shifts[:, None]).max(axis=0) for block in blocks),
+                GATE_DB,
+                l_margin_frames,
+                r_margin_frames,
+                total_frames,
+            )
+        )
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return None
+    finally:
+        blocks.close()
+
+
+# --
+# -- Threshold sweep preview
+# --
+def clip_loudness(file_path: Path, fps: float) -> tuple:
+    """Loudness of the selected tracks of one clip for a sweep, from the envelope cache or decoded once. Returns `(swept, fixed)`: the per-frame max of the tracks that follow `GATE_DB`, and a mask of the frames where a track with its own `TRACK_GATE_DB` is loud. None on failure."""
+    fingerprint = file_fingerprint(file_path) if CACHE_SIZE_MB else None
+    reduced_rate = decode_sample_rate(file_path)
+    envelopes = None
+    if fingerprint is not None:
+        envelopes = [
+            load_envelope(fingerprint, s, fps, reduced_rate) for s in USE_AUDIO_TRACKS
+        ]
+    if envelopes is not None and all(envelope is not None for envelope in envelopes):
+        usable = min(len(envelope) for envelope in envelopes)
+        envelopes = np.stack([envelope[:usable] for envelope in envelopes])
+    else:
+        print(f"Analyzing {file_path.name}...")
+        try:
+            envelopes = np.concatenate(
+                list(
+                    iter_envelopes(
+                        file_path, USE_AUDIO_TRACKS, fps, fingerprint, reduced_rate
+                    )
+                ),
+                axis=1,
+            )
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            return None
+
+    own = np.array([str(s) in TRACK_GATE_DB for s in USE_AUDIO_TRACKS])
+    swept = np.full(envelopes.shape[1], -np.inf, dtype=np.float32)
+    if not own.all():
+        swept = envelopes[~own].max(axis=0)
+    own_gates = np.array([track_gate_db(s) for s in USE_AUDIO_TRACKS])[own]
+    fixed = (envelopes[own] > own_gates[:, None]).any(axis=0)
+    return swept, fixed
+
+
+def sweep_clip(
+    loudness: tuple, thresholds: list, margin_frames: list, total_frames: int
+) -> tuple:
+    """Timeline items and kept frames of one clip (`loudness` from `clip_loudness()`) for every threshold/margin combination, as two `(len(thresholds), len(margin_frames))` arrays. Margins are applied on both sides.
+
+    All thresholds are done at once: a frame is kept when its padding window `[frame - margin, frame + margin]` holds a loud frame, which a cumulative sum over the loud masks answers for every frame in one go. This gives exactly what `chunks_from_loudness()` would for each combination.
+    """
+    swept, fixed = loudness
+    loud = np.zeros((len(thresholds), total_frames + 1), dtype=np.int32)
+    usable = min(total_frames, len(swept))
+    loud[:, 1 : usable + 1] = (
+        swept[None, :usable] > np.array(thresholds)[:, None]
+    ) | fixed[None, :usable]
+    loud_before = np.cumsum(loud, axis=1)  # loud frames before each frame
+
+    frames = np.arange(total_frames)
+    items = np.zeros((len(thresholds), len(margin_frames)), dtype=np.int64)
+    kept_frames = np.zeros_like(items)
+    for j, margin in enumerate(margin_frames):
+        window_start = np.clip(frames - margin, 0, total_frames)
+        window_end = np.clip(frames + margin + 1, 0, total_frames)
+        kept = loud_before[:, window_end] > loud_before[:, window_start]
+        kept_frames[:, j] = kept.sum(axis=1)
+        audible_runs = (np.diff(kept.astype(np.int8), axis=1, prepend=0) == 1).sum(1)
+        items[:, j] = audible_runs
+        if not DELETE_SILENCE:
+            silent = ~kept
+            items[:, j] += (
+                np.diff(silent.astype(np.int8), axis=1, prepend=0) == 1
+            ).sum(1)
+    return items, kept_frames
+
+
+def run_sweep(jobs: list, thresholds: list, margins: list) -> list:
+    """Analyzes the `(file_path, fps, total_frames)` jobs once and returns one row per threshold (dB) and margin (seconds, both sides) combination, summed over all clips: `{"GATE_DB", "MARGIN", "segments", "kept_percent", "output_seconds"}`. The output is the duration left once the silence is removed.
+
+    Tracks with their own `TRACK_GATE_DB` keep it, counts are before `MIN_AUDIBLE_SECONDS`, `MIN_SILENCE_SECONDS` and `MAX_SEGMENTS_PER_CLIP`. Needs numpy.
+    """
+    workers = ANALYSIS_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        curves = list(
+            executor.map(
+                lambda job: clip_loudness(job[0], exact_fps(job[1])),
+                jobs,
+            )
+        )
+    if CACHE_SIZE_MB:
+        evict_cache()
+
+    items = np.zeros((len(thresholds), len(margins)), dtype=np.int64)
+    kept_seconds = np.zeros((len(thresholds), len(margins)))
+    total_seconds = 0.0
+    for (file_path, fps, total_frames), loudness in zip(jobs, curves):
+        if loudness is None:
+            print(f"Skipping {file_path.name} due to analysis error.")
+            continue
+        fps = exact_fps(fps)
+        clip_items, clip_kept = sweep_clip(
+            loudness,
+            thresholds,
+            [max(round(margin * fps), 0) for margin in margins],
+            total_frames,
+        )
+        items += clip_items
+        kept_seconds += clip_kept / fps
+        total_seconds += total_frames / fps
+
+    rows = []
+    for i, threshold in enumerate(thresholds):
+        for j, margin in enumerate(margins):
+            rows.append(
+                {
+                    "GATE_DB": threshold,
+                    "MARGIN": margin,
+                    "segments": int(items[i, j]),
+                    "kept_percent": (
+                        100 * kept_seconds[i, j] / total_seconds
+                        if total_seconds
+                        else 0.0
+                    ),
+                    "output_seconds": float(kept_seconds[i, j]),
+                }
+            )
+    return rows
+
+
+def sweep_in_background(jobs: list, thresholds: list, margins: list) -> dict:
+    """Runs `run_sweep()` on a background thread so the GUI stays responsive while the clips are decoded. Returns the progress the GUI polls: `{"total", "started", "rows", "finished", "thread"}`, rows stay None if the sweep failed."""
+    sweep_progress = {
+        "total": len(jobs),
+        "started": time.perf_counter(),
+        "rows": None,
+        "finished": False,
+    }
+
+    def run():
+        try:
+            sweep_progress["rows"] = run_sweep(jobs, thresholds, margins)
+        finally:
+            sweep_progress["finished"] = True
+
+    sweep_progress["thread"] = threading.Thread(target=run, daemon=True)
+    sweep_progress["thread"].start()
+    return sweep_progress
+
+
+def format_duration(seconds: float) -> str:
+    """h:mm:ss"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def parse_number_list(text: str) -> list:
+    """Comma separated numbers from a settings/GUI field, unreadable entries are skipped."""
+    numbers = []
+    for entry in str(text).split(","):
+        try:
+            numbers.append(float(entry.strip().lower().replace("db", "")))
+        except ValueError:
+            continue
+    return numbers
+
+
+def print_sweep(rows: list):
+    """Prints the rows of `run_sweep()` as a table."""
+    print(f"{'threshold':>10}{'margin':>8}{'segments':>10}{'kept':>8}{'output':>10}")
+    for row in rows:
+        print(
+            f"{row['GATE_DB']:>8g}dB{row['MARGIN']:>7g}s{row['segments']:>10}{row['kept_percent']:>7.1f}%{format_duration(row['output_seconds']):>10}"
+        )
+
+
+# --
+# -- Reduced rate decode check
+# --
+def decode_loudness(file_path: Path, fps: float, reduced_rate: int) -> tuple:
+    """Combined loudness of the selected tracks (see `track_shifts()`) decoded at full rate or at `reduced_rate`, without the cache. Returns `(loudness, seconds)`."""
+    started = time.perf_counter()
+    blocks = list(
+        iter_frame_loudness_db(
+            file_path, USE_AUDIO_TRACKS, fps, LOUDNESS_MEASURE, reduced_rate
+        )
+    )
+    loudness = (np.concatenate(blocks, axis=1) + track_shifts()[:, None]).max(axis=0)
+    return loudness, time.perf_counter() - started
+
+
+def compare_decode_rates(jobs: list, reduced_rate: int) -> list:
+    """Decodes every `(file_path, fps, total_frames)` job at full rate and at `reduced_rate` and returns one row per clip with both decode times and how far the results are apart: `{"file", "seconds", "full_seconds", "reduced_seconds", "level_difference_db", "full_segments", "reduced_segments", "changed_percent"}`.
+
+    The level difference is the median over the frames within 20 dB of `GATE_DB`, the ones where it could decide something. Changed frames are the ones that end up audible in one cut and silent in the other, after the margins. Clips are decoded one at a time so the timings dont compete for the cpu.
+    """
+    rows = []
+    for file_path, fps, total_frames in jobs:
+        fps = exact_fps(fps)
+        print(f"Decoding {file_path.name}...")
+        try:
+            full, full_seconds = decode_loudness(file_path, fps, 0)
+            reduced, reduced_seconds = decode_loudness(file_path, fps, reduced_rate)
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            continue
+
+        usable = min(len(full), len(reduced))
+        near_gate = full[:usable] > GATE_DB - 20
+        level_difference = np.abs(full[:usable] - reduced[:usable])[near_gate]
+
+        l_margin_frames = round(L_TRIM_MARGIN * fps)
+        r_margin_frames = round(R_TRIM_MARGIN * fps)
+        full_segments, reduced_segments = [
+            Segments.from_chunks(
+                chunks_from_loudness(
+                    loudness, GATE_DB, l_margin_frames, r_margin_frames, total_frames
+                )
+            )
+            for loudness in (full, reduced)
+        ]
+        frames = np.arange(total_frames)
+        changed = full_segments.audible_at(frames) != reduced_segments.audible_at(
+            frames
+        )
+
+        rows.append(
+            {
+                "file": file_path.name,
+                "seconds": total_frames / fps,
+                "full_seconds": full_seconds,
+                "reduced_seconds": reduced_seconds,
+                "level_difference_db": (
+                    float(np.median(level_difference)) if len(level_difference) else 0.0
+                ),
+                "full_segments": full_segments.audible_count(),
+                "reduced_segments": reduced_segments.audible_count(),
+                "changed_percent": (
+                    100 * int(changed.sum()) / total_frames if total_frames else 0.0
+                ),
+            }
+        )
+    return rows
+
+
+def print_decode_check(rows: list, reduced_rate: int):
+    """Prints the rows of `compare_decode_rates()` as a table."""
+    print()
+    print(
+        f"{'clip':<28}{'length':>9}{'full':>9}{f'{reduced_rate} Hz':>9}{'speedup':>9}{'level':>9}{'segments':>13}{'changed':>9}"
+    )
+    for row in rows:
+        speedup = row["full_seconds"] / max(row["reduced_seconds"], 1e-9)
+        segments = f"{row['full_segments']}/{row['reduced_segments']}"
+        print(
+            f"{row['file'][:27]:<28}{format_duration(row['seconds']):>9}{row['full_seconds']:>8.2f}s{row['reduced_seconds']:>8.2f}s{speedup:>8.1f}x{row['level_difference_db']:>7.2f}dB{segments:>13}{row['changed_percent']:>8.2f}%"
+        )
+
+
+# --
+# -- Run report
+# --
+def resource_usage() -> dict:
+    """CPU seconds used by finished subprocesses and peak RSS (MB) of this process and its children, or None where `resource` is not available."""
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in KB on linux but in bytes on mac
+    rss_unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "subprocess_cpu_seconds": children.ru_utime + children.ru_stime,
+        "peak_rss_mb": own.ru_maxrss / rss_unit,
+        "subprocess_peak_rss_mb": children.ru_maxrss / rss_unit,
+    }
+
+
+def start_run_report():
+    """Starts collecting timings for a new run report, see `finish_run_report()`."""
+    run_report.clear()
+    run_report["started"] = datetime.now().isoformat(timespec="seconds")
+    run_report["stages"] = {}
+    run_report["api_calls"] = 0
+    run_report["api_objects"] = 0
+    run_report["clips"] = []
+    run_report["current"] = None
+    run_report["usage_at_start"] = resource_usage()
+
+
+def clip_report(file_path: Path) -> dict:
+    """Adds a report entry for one clip and returns it."""
+    entry = {
+        "file": str(file_path),
+        "stages": {},
+        "cache_hit": False,
+        "manifest": False,
+        "segments": 0,
+        "audible_segments": 0,
+        "appended": 0,
+        "items_saved": 0,
+        "api_calls": 0,
+    }
+    run_report.setdefault("clips", []).append(entry)
+    return entry
+
+
+@contextmanager
+def timed(stage: str, entry: dict = None):
+    """Adds the time spent in the `with` block to `stage` of `entry`. Without an entry it goes to the clip main() is currently putting on the timeline, or to the run itself."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if entry is None:
+            entry = run_report.get("current") or run_report
+        stages = entry.setdefault("stages", {})
+        stages[stage] = stages.get(stage, 0) + time.perf_counter() - started
+
+
+def count_api_calls(calls: int = 1, objects: int = 0):
+    """Counts Resolve API calls and the API objects they returned for the run report, see `ResolveObject`."""
+    run_report["api_calls"] = run_report.get("api_calls", 0) + calls
+    run_report["api_objects"] = run_report.get("api_objects", 0) + objects
+
+
+class ResolveObject:
+    """Wraps an object of the Resolve API so every method call on it is counted for the run report, in one place instead of at every call site. API objects it returns (also inside lists and dicts) are wrapped too, the ones passed in are unwrapped again, so wrapping `resolve` once at the start is enough."""
+
+    __slots__ = ("api_object",)
+
+    def __init__(self, api_object):
+        self.api_object = api_object
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.api_object, name)
+        if not callable(attribute):
+            return resolve_object(attribute)
+
+        def call(*args):
+            result = attribute(*[unwrap_resolve_object(arg) for arg in args])
+            wrapped = resolve_object(result)
+            # a long item list costs more than one call, its size is counted too
+            if isinstance(wrapped, (list, dict)):
+                count_api_calls(1, len(wrapped))
+            else:
+                count_api_calls(1, int(isinstance(wrapped, ResolveObject)))
+            return wrapped
+
+        return call
+
+    def __eq__(self, other):
+        return self.api_object == unwrap_resolve_object(other)
+
+    def __hash__(self):
+        return hash(self.api_object)
+
+    def __bool__(self):
+        return bool(self.api_object)
+
+
+def resolve_object(value):
+    """`value` returned by the Resolve API, with every API object in it wrapped in `ResolveObject`."""
+    if value is None or isinstance(value, (str, int, float, bool, ResolveObject)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [resolve_object(item) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve_object(item) for key, item in value.items()}
+    return ResolveObject(value)
+
+
+def unwrap_resolve_object(value):
+    """The reverse of `resolve_object()`, for arguments going back into the Resolve API."""
+    if isinstance(value, ResolveObject):
+        return value.api_object
+    if isinstance(value, (list, tuple)):
+        return [unwrap_resolve_object(item) for item in value]
+    if isinstance(value, dict):
+        return {key: unwrap_resolve_object(item) for key, item in value.items()}
+    return value
+
+
+def finish_run_report():
+    """Writes the run report to `settings_dir/run_report.json` and prints a summary table."""
+    usage_at_start = run_report.pop("usage_at_start", None)
+    run_report.pop("current", None)
+    run_report["finished"] = datetime.now().isoformat(timespec="seconds")
+
+    usage = resource_usage()
+    if usage is not None and usage_at_start is not None:
+        usage["subprocess_cpu_seconds"] -= usage_at_start["subprocess_cpu_seconds"]
+    run_report["resources"] = usage
+
+    totals = {
+        "stages": dict(run_report["stages"]),
+        "segments": 0,
+        "appended": 0,
+        "items_saved": 0,
+    }
+    for entry in run_report["clips"]:
+        for stage, seconds in entry["stages"].items():
+            totals["stages"][stage] = totals["stages"].get(stage, 0) + seconds
+        totals["segments"] += entry["segments"]
+        totals["appended"] += entry["appended"]
+        totals["items_saved"] += entry["items_saved"]
+    run_report["totals"] = totals
+
+    report_file = settings_dir / "run_report.json"
+    with open(report_file, "w") as f:
+        json.dump(run_report, f, indent=4)
+
+    print(
+        f"{'clip':<32}{'segments':>9}{'saved':>7}{'analysis':>10}{'append':>9}{'color':>9}{'api calls':>11}"
+    )
+    for entry in run_report["clips"]:
+        stages = entry["stages"]
+        name = Path(entry["file"]).name[:31]
+        if entry["manifest"]:
+            analysis = "manifest"
+        elif entry["cache_hit"]:
+            analysis = "cached"
+        else:
+            analysis = f"{stages.get('analysis', 0):.2f}s"
+        print(
+            f"{name:<32}{entry['segments']:>9}{entry['items_saved']:>7}{analysis:>10}{stages.get('append', 0):>8.2f}s{stages.get('color', 0):>8.2f}s{entry['api_calls']:>11}"
+        )
+    stages = totals["stages"]
+    print(
+        f"{'total':<32}{totals['segments']:>9}{totals['items_saved']:>7}{stages.get('analysis', 0):>9.2f}s{stages.get('append', 0):>8.2f}s{stages.get('color', 0):>8.2f}s{run_report['api_calls']:>11}"
+    )
+    print(
+        f"Resolve API: {run_report['api_calls']} calls returned {run_report.get('api_objects', 0)} objects"
+    )
+    if usage is not None:
+        print(
+            f"subprocess cpu: {usage['subprocess_cpu_seconds']:.1f}s, peak memory: {usage['peak_rss_mb']:.0f} MB (subprocesses {usage['subprocess_peak_rss_mb']:.0f} MB)"
+        )
+    print(f"run report saved to {report_file}")
+    run_report.clear()
+
+
+def reset_timeline_index():
+    """Forgets every indexed timeline item, needs to be called whenever a new timeline is created."""
+    timeline_index.clear()
+    timeline_index["video_items"] = 0
+    timeline_index["audio_items"] = {}
+    timeline_index["audio_items_by_start"] = {}
+
+
+def index_existing_timeline():
+    """Counts everything already on `current_timeline` as indexed, so appending to a timeline from an earlier run only looks at the new items."""
+    reset_timeline_index()
+    timeline_index["video_items"] = len(
+        current_timeline.GetItemListInTrack("video", 1) or []
+    )
+    audio_tracks = current_timeline.GetTrackCount("audio")
+    for i in range(1, audio_tracks + 1):
+        timeline_index["audio_items"][i] = len(
+            current_timeline.GetItemListInTrack("audio", i) or []
+        )
+
+
+def update_timeline_index(appended=None) -> list:
+    """Adds the items appended since the last call to `timeline_index` and returns the new video items.
+
+    `appended` is what AppendToTimeline returned, the new video and audio items. Only those are looked at, so what crosses the Resolve API per clip grows with the clip being added and not with the whole timeline. The track lists are only fetched (and their new tail indexed) when the items are missing or can't tell their track, e.g. on Resolve versions without GetTrackTypeAndIndex().
+    """
+    if not timeline_index:
+        reset_timeline_index()
+
+    if appended and isinstance(appended, list):
+        try:
+            tracks = [item.GetTrackTypeAndIndex() for item in appended]
+        except AttributeError:
+            tracks = []
+        if tracks and all(tracks):
+            return index_appended_items(appended, tracks)
+
+    video_items = current_timeline.GetItemListInTrack("video", 1) or []
+    new_video_items = video_items[timeline_index["video_items"] :]
+    timeline_index["video_items"] = len(video_items)
+
+    # lookup for audio items by their timeline start frame
+    audio_items_by_start = timeline_index["audio_items_by_start"]
+    audio_tracks = current_timeline.GetTrackCount("audio")
+    for i in range(1, audio_tracks + 1):
+        audio_items = current_timeline.GetItemListInTrack("audio", i) or []
+        new_audio_items = audio_items[timeline_index["audio_items"].get(i, 0) :]
+        for item in new_audio_items:
+            audio_items_by_start.setdefault(item.GetStart(), []).append(item)
+        timeline_index["audio_items"][i] = len(audio_items)
+
+    return new_video_items
+
+
+def index_appended_items(appended: list, tracks: list) -> list:
+    """`update_timeline_index()` for the `appended` items with their `[track_type, track_index]` in `tracks`, without listing the tracks."""
+    new_video_items = []
+    audio_items_by_start = timeline_index["audio_items_by_start"]
+    for item, (track_type, track_index) in zip(appended, tracks):
+        track_index = int(track_index)
+        if track_type == "video" and track_index == 1:
+            new_video_items.append(item)
+            timeline_index["video_items"] += 1
+        elif track_type == "audio":
+            audio_items_by_start.setdefault(item.GetStart(), []).append(item)
+            audio_items = timeline_index["audio_items"]
+            audio_items[track_index] = audio_items.get(track_index, 0) + 1
+    return new_video_items
+
+
+def populate_and_color_timeline(
+    chunks: list,
+    source_clip,
+    delete_silence: bool,
+    highlight_color: str,
+    timeline_offset: int,
+):
+    """
+    Populates the timeline from the `(start_frame, end_frame, is_audible)` chunks (or `Segments`)
+    of one analysis and colors audible clips regardless of the delete_silence setting.
+    Raises RuntimeError when the clip could not be appended completely, nothing of it is
+    left on the timeline then (see `append_in_chunks()`).
+    """
+    segments = Segments.from_chunks(chunks)
+
+    if not len(segments):
+        print("No video clips found in the analysis.")
+        return
+
+    total_source_frames = int(source_clip.GetClipProperty("Frames"))
+
+    # the last segment always runs to the end of the source clip
+    ends = segments.ends.tolist()
+    ends[-1] = total_source_frames
+    clips_to_append = [
+        {
+            "mediaPoolItem": source_clip,
+            "startFrame": start_frame,
+            "endFrame": end_frame,
+        }
+        for start_frame, end_frame, is_audible in zip(
+            segments.starts.tolist(), ends, segments.audible.tolist()
+        )
+        if is_audible or not delete_silence
+    ]
+
+    if not clips_to_append:
+        print("No clips to append after processing.")
+        return
+
+    print(f"Appending {len(clips_to_append)} clips...")
+    with timed("append"):
+        new_video_items = append_in_chunks(clips_to_append)
+
+    print("Coloring audible clips...")
+    audio_items_by_start = timeline_index["audio_items_by_start"]
+
+    with timed("color"):
+        # GetLeftOffset() gives the frame offset from the start of the source media,
+        # an item is audible when that frame falls into an audible segment
+        source_start_frames = [item.GetLeftOffset() for item in new_video_items]
+        coloring_plan = [
+            video_item
+            for video_item, is_audible in zip(
+                new_video_items, segments.audible_at(source_start_frames)
+            )
+            if is_audible
+        ]
+
+        for video_item in coloring_plan:
+            # Color the video clip
+            video_item.SetClipColor(highlight_color)
+
+            # Find and color corresponding audio clips using the lookup
+            timeline_start_frame = video_item.GetStart()
+            if timeline_start_frame in audio_items_by_start:
+                for audio_item in audio_items_by_start[timeline_start_frame]:
+                    audio_item.SetClipColor(highlight_color)
+
+    if run_report.get("current"):
+        run_report["current"]["appended"] += len(new_video_items)
+
+
+def append_in_chunks(clips_to_append: list) -> list:
+    """Appends `clips_to_append` in `APPEND_CHUNK_SIZE` pieces and returns the new video items. Raises RuntimeError if a piece still did not land after `APPEND_ATTEMPTS` tries, after taking what did land off the timeline again: a clip that is only partly there would be appended in full by the next run, next to its first part.
+
+    Every piece is checked against the items AppendToTimeline returns for it (see `update_timeline_index()`), so no track is listed again and the cost per piece does not grow with the timeline. Whatever did land is kept and only the rest of that piece is retried, so a failure never redoes segments that are already on the timeline.
+    """
+    chunk_size = APPEND_CHUNK_SIZE or len(clips_to_append)
+    new_video_items = []
+    position = 0  # everything before this index is on the timeline
+
+    while position < len(clips_to_append):
+        chunk = clips_to_append[position : position + chunk_size]
+        for attempt in range(1, APPEND_ATTEMPTS + 1):
+            appended = media_pool.AppendToTimeline(chunk)
+            landed = update_timeline_index(appended)
+            new_video_items.extend(landed)
+            position += len(landed)
+            if len(landed) >= len(chunk):
+                break
+
+            # resume right after the last item that made it
+            chunk = chunk[len(landed) :]
+            if attempt == APPEND_ATTEMPTS:
+                continue
+            print(
+                f"WARNING: only {len(landed)} clips landed, retrying {len(chunk)} ({attempt}/{APPEND_ATTEMPTS})..."
+            )
+            time.sleep(0.5 * attempt)
+        else:
+            remove_appended_items(new_video_items)
+            raise RuntimeError(
+                f"Failed to append clips to timeline, {len(clips_to_append) - position} of {len(clips_to_append)} clips are missing. Removed the {position} that landed."
+            )
+
+    return new_video_items
+
+
+def remove_appended_items(video_items: list):
+    """Deletes `video_items` and the audio items at their positions from `current_timeline` and indexes it anew, so the next clip is appended and colored as if they had never been there."""
+    audio_items_by_start = timeline_index["audio_items_by_start"]
+    items = list(video_items)
+    for video_item in video_items:
+        items.extend(audio_items_by_start.get(video_item.GetStart(), []))
+    if items and not current_timeline.DeleteClips(items, False):
+        print(f"ERROR: Could not remove {len(video_items)} partly appended clips.")
+    index_existing_timeline()
+
+
+def analyze_clip(
+    file_path: Path, fps: float, total_frames: int, edit_param: str, report: dict
+) -> list:
+    """Runs the analysis (auto-editor or numpy backend) for one clip and returns its chunks (see `load_v1_chunks()`), or None on failure. Only touches the file system, never the Resolve API, so it is safe to run from worker threads.
+
+    A matching segment manifest or cache entry skips the analysis completely, see `find_analysis()`. Timings go to the `report` entry of the clip.
+    """
+
+    chunks, fingerprint = find_analysis(file_path, fps, total_frames, report)
+    if chunks is not None:
+        return chunks
+
+    print(f"Analyzing {file_path.name}...")
+    if ANALYSIS_BACKEND == "numpy":
+        with timed("analysis", report):
+            chunks = numpy_analyze(file_path, fps, total_frames, fingerprint)
+    else:
+        chunks = auto_editor_analyze(file_path, edit_param, report)
+
+    if chunks is not None and CACHE_SIZE_MB:
+        params = chunk_params(fps, total_frames)
+        with timed("cache", report):
+            write_cache(cache_key(fingerprint, params), fingerprint, params, chunks)
+    print(f"{file_path.name} analyzed.")
+    return chunks
+
+
+def find_analysis(
+    file_path: Path, fps: float, total_frames: int, report: dict
+) -> tuple:
+    """Looks for an earlier analysis of `file_path` with the current `chunk_params()`, first in its segment manifest (see `run_analyze_command()`) then in the cache.
+
+    Returns `(chunks, fingerprint)`, chunks is None when the clip still has to be analyzed. The fingerprint is only computed when something needs it, otherwise it is None too.
+    """
+
+    fingerprint = None
+    if manifest_path_for(file_path).exists():
+        with timed("cache", report):
+            fingerprint = file_fingerprint(file_path)
+            chunks = read_manifest(file_path, fingerprint, fps, total_frames)
+        if chunks is not None:
+            print(f"{file_path.name} found in segment manifest.")
+            report["manifest"] = True
+            return chunks, fingerprint
+
+    if CACHE_SIZE_MB:
+        with timed("cache", report):
+            fingerprint = fingerprint or file_fingerprint(file_path)
+            chunks = read_cache(cache_key(fingerprint, chunk_params(fps, total_frames)))
+        if chunks is not None:
+            print(f"{file_path.name} found in analysis cache.")
+            report["cache_hit"] = True
+            return chunks, fingerprint
+
+    return None, fingerprint
+
+
+def auto_editor_edit_param() -> str:
+    """The auto-editor `--edit` expression for `USE_AUDIO_TRACKS`, each with its `track_gate_db()`."""
+
+    # Formatting for auto-editor is different for 1+ audio streams
+    if len(USE_AUDIO_TRACKS) == 1:
+        # Using sugary syntax, e.g., "audio:-20dB,stream=0"
+        return (
+            f"audio:{track_gate_db(USE_AUDIO_TRACKS[0])}dB,stream={USE_AUDIO_TRACKS[0]}"
+        )
+    else:
+        # For multiple tracks, we must use a palet expression.
+        # The palet 'audio' function requires a linear threshold (0.0 to 1.0),
+        # not a dB value. We convert the dB value to a linear amplitude value.
+        # Formula: amplitude = 10^(dB / 20)
+        thresholds = []
+        for stream in USE_AUDIO_TRACKS:
+            gate_db = track_gate_db(stream)
+            try:
+                thresholds.append(10 ** (gate_db / 20))
+            except (ValueError, OverflowError, TypeError):
+                # Fallback to a sensible default if conversion fails
+                print(
+                    f"Warning: Could not convert GATE_DB value '{gate_db}' to a linear threshold. Using default."
+                )
+                thresholds.append(0.1)  # Corresponds to -20dB
+
+        # Using palet expression syntax, e.g., "(or (audio 0.1 #:stream 0) (audio 0.1 #:stream 1))"
+        streams = " ".join(
+            f"audio:{threshold},stream={stream}"
+            for stream, threshold in zip(USE_AUDIO_TRACKS, thresholds)
+        )
+        return f"(or {streams})"
+
+
+def auto_editor_analyze(file_path: Path, edit_param: str, report: dict) -> list:
+    """Runs auto-editor once on `file_path` and returns its chunks, or None on failure."""
+
+    # one analysis per clip: the v1 export keeps every chunk and its speed,
+    # so the full segment list and the audible subset both come out of it
+    v1_path = v1_path_for(file_path)
+    analysis_flags = [
+        "auto-editor",
+        str(file_path),
+        "--edit",
+        edit_param,
+        "--margin",
+        f"{L_TRIM_MARGIN}s,{R_TRIM_MARGIN}s",
+        "--export",
+        "v1",
+        "--output",
+        str(v1_path),
+    ]
+
+    server = borrow_analysis_server() if WARM_ANALYSIS else None
+    if server is not None:
+        try:
+            with timed("analysis", report):
+                chunks = server_analyze(server, analysis_flags[1:], v1_path)
+            release_analysis_server(server)
+            return chunks
+        except (OSError, ValueError) as e:
+            print(f"Analysis process failed on {file_path.name} ({e}), retrying.")
+            discard_analysis_server(server)
+
+    with timed("analysis", report):
+        # auto-editor's own temp files go to the scratch folder too
+        subprocess.run(
+            analysis_flags,
+            cwd=str(v1_path.parent),
+            creationflags=CREATE_NO_WINDOW,
+        )
+
+    with timed("parse", report):
+        chunks = load_v1_chunks(v1_path)
+    remove_scratch_file(v1_path)
+    return chunks
+
+
+def v1_path_for(file_path: Path) -> Path:
+    """Where the v1 analysis of `file_path` is written. Clips with the same name in different folders get their own file."""
+    folder_hash = hashlib.blake2b(str(file_path).encode(), digest_size=4).hexdigest()
+    return scratch_path(f"{file_path.stem}_{folder_hash}_chunks.v1")
+
+
+def manifest_path_for(file_path: Path) -> Path:
+    """Where the segment manifest of `file_path` is written by the `analyze` command."""
+    return file_path.with_name(f"{file_path.stem}_segments.json")
+
+
+def write_manifest(
+    file_path: Path, fingerprint: str, fps: float, total_frames: int, chunks: list
+):
+    """Writes the segment manifest of `file_path`, it is picked up by the next run inside Resolve."""
+    manifest = {
+        "version": 1,
+        "file": file_path.name,
+        "fingerprint": fingerprint,
+        "params": detection_params(),
+        "fps": fps,
+        "total_frames": total_frames,
+        "chunks": chunks,
+    }
+    manifest_file = manifest_path_for(file_path)
+    tmp_file = manifest_file.with_name(f"{manifest_file.name}.{os.getpid()}.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_file, manifest_file)
+
+
+def read_manifest(
+    file_path: Path, fingerprint: str, fps: float, total_frames: int
+) -> list:
+    """Returns the chunks of the segment manifest of `file_path`, or None if there is none or it was made for a different file version, fps or detection settings.
+
+    The `analyze` command gets a clip's length from ffprobe, which can be a frame off from the `total_frames` Resolve counts. Chunks ending within a frame of it are fitted to it, a bigger difference means they do not belong to this clip and it is analyzed again.
+    """
+    try:
+        with open(manifest_path_for(file_path), "r") as f:
+            manifest = json.load(f)
+    except (OSError, json.decoder.JSONDecodeError):
+        return None
+    if (
+        manifest.get("version") != 1
+        or manifest.get("fingerprint") != fingerprint
+        or manifest.get("params") != detection_params()
+        or abs(manifest.get("fps", 0) - fps) > 0.01
+    ):
+        print(
+            f"{file_path.name} has a segment manifest for other settings or another version of the file, ignoring it."
+        )
+        return None
+    chunks = [(start, end, is_audible) for start, end, is_audible in manifest["chunks"]]
+    if not chunks:
+        return chunks
+    if abs(chunks[-1][1] - total_frames) > 1:
+        print(
+            f"{file_path.name} has a segment manifest for {chunks[-1][1]} frames but the clip has {total_frames}, ignoring it."
+        )
+        return None
+    # the last chunk runs to the clip's real end
+    chunks = [chunk for chunk in chunks if chunk[0] < total_frames]
+    if chunks:
+        start, _, is_audible = chunks[-1]
+        chunks[-1] = (start, total_frames, is_audible)
+    return chunks
+
+
+def clip_jobs() -> list:
+    """`(clip, file_path, fps, total_frames)` of every clip with a file, read from the Resolve API on the calling thread."""
+    jobs = []
+    for clip in clips:
+        file_path = clip.GetClipProperty()["File Path"]
+        if not file_path:
+            continue
+        fps = float(clip.GetClipProperty("FPS"))
+        total_frames = int(clip.GetClipProperty("Frames"))
+        jobs.append((clip, Path(file_path), fps, total_frames))
+    return jobs
+
+
+def consolidate_segments(segments: Segments, fps: float, report: dict) -> Segments:
+    """Applies `MIN_SILENCE_SECONDS`, `MIN_AUDIBLE_SECONDS` and `MAX_SEGMENTS_PER_CLIP` to the segments of one clip and notes the timeline items this saves in `report`."""
+
+    def timeline_items(segments: Segments) -> int:
+        return segments.audible_count() if DELETE_SILENCE else len(segments)
+
+    simplified = segments.simplified(
+        round(MIN_AUDIBLE_SECONDS * fps),
+        round(MIN_SILENCE_SECONDS * fps),
+        MAX_SEGMENTS_PER_CLIP,
+    )
+    report["items_saved"] = timeline_items(segments) - timeline_items(simplified)
+    if report["items_saved"]:
+        print(
+            f"Merged short segments, {timeline_items(simplified)} instead of {timeline_items(segments)} clips."
+        )
+    return simplified
+
+
+def clip_segments(chunks: list, fps: float, report: dict) -> Segments:
+    """The segments of one analyzed clip as they go on the timeline, after `consolidate_segments()`. Counts go to `report`."""
+    segments = Segments.from_chunks(chunks)
+    if MIN_AUDIBLE_SECONDS or MIN_SILENCE_SECONDS or MAX_SEGMENTS_PER_CLIP:
+        segments = consolidate_segments(segments, fps, report)
+    report["segments"] = len(segments)
+    report["audible_segments"] = segments.audible_count()
+    return segments
+
+
+def iter_analysis_results(jobs: list, reports: list, edit_param: str):
+    """Yields the chunks of the `(clip, file_path, fps, total_frames)` jobs in clip order as soon as each one is analyzed, None for clips that failed. The caller can put clip N on the timeline while the workers are already on the next ones.
+
+    Only `ANALYSIS_LOOKAHEAD` clips per worker are started ahead of the one the caller waits for, so finished results do not pile up when the timeline is the slow part.
+    """
+    if JOB_QUEUE_DIR:
+        # the queue hands results back in whatever order the workers finish
+        futures = [Future() for _ in jobs]
+
+        def run_queue():
+            try:
+                run_job_queue(
+                    jobs, reports, lambda i, chunks: futures[i].set_result(chunks)
+                )
+            except Exception as e:
+                print(f"ERROR: job queue failed: {e}")
+            finally:
+                # a crashed queue must not leave the timeline waiting forever
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+
+        queue_thread = threading.Thread(target=run_queue, daemon=True)
+        queue_thread.start()
+        for future in futures:
+            yield future.result()
+        queue_thread.join()
+        return
+
+    workers = ANALYSIS_WORKERS or os.cpu_count() or 1
+    print(f"Analyzing {len(jobs)} clip(s) with {min(workers, len(jobs))} worker(s)...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        submitted = 0
+        for job in jobs:
+            while submitted < len(jobs) and len(futures) < workers * ANALYSIS_LOOKAHEAD:
+                futures.append(
+                    executor.submit(
+                        analyze_clip,
+                        *jobs[submitted][1:],
+                        edit_param,
+                        reports[submitted],
+                    )
+                )
+                submitted += 1
+            try:
+                chunks = futures.popleft().result()
+            except Exception as e:
+                # one broken clip is skipped like any other failed analysis
+                print(f"ERROR: analysis of {job[1].name} failed: {e}")
+                chunks = None
+            yield chunks
+
+
+def main():
+    # flow of main():
+    # 1. Analyze the clips using auto-editor (V1 JSON with every chunk) or numpy, in parallel
+    # 2. Write an empty XML timeline in the first clip's format and import it
+    # 3. Append the chunks to the new timeline and color the audible ones, clip by clip
+    #    in the original order while the workers keep analyzing the next clips
+
+    global current_timeline
+    is_new_timeline = True
+    timeline_offset = 0
+    if "started" not in run_report:
+        start_run_report()
+    main_started = time.perf_counter()
+
+    edit_param = auto_editor_edit_param()
+
+    # collect clip info on this thread, the resolve api should not be used from the workers
+    jobs = clip_jobs()
+    manifest = read_project_manifest()
+    if UPDATE_TIMELINE:
+        target = timeline_to_update(manifest)
+        if target is not None:
+            update_timeline(target, jobs, manifest, edit_param)
+            run_report["stages"]["main"] = time.perf_counter() - main_started
+            finish_run_report()
+            return
+    if ONLY_NEW_CLIPS:
+        clip_count = len(jobs)
+        jobs, append_to = select_new_clips(jobs, manifest)
+        print(f"{clip_count - len(jobs)} of {clip_count} clip(s) are already cut.")
+        if append_to is not None and jobs:
+            # new clips go to the end of the timeline the earlier ones are on
+            project.SetCurrentTimeline(append_to)
+            current_timeline = append_to
+            timeline_name = append_to.GetName()
+            index_existing_timeline()
+            is_new_timeline = False
+            print(f"Appending to timeline: {timeline_name}")
+    reports = [clip_report(job[1]) for job in jobs]
+
+    # the decoding happens in auto-editor/ffmpeg processes (and numpy releases the gil),
+    # so threads are enough to keep every core busy (a process pool would respawn resolve itself)
+    results = iter_analysis_results(jobs, reports, edit_param)
+
+    # timeline creation stays serial and in the original clip order
+    for (clip, file_path, fps, _), chunks, report in zip(jobs, results, reports):
+        print(f"Processing {file_path.name} at: {file_path.parent}")
+
+        if chunks is None:
+            print(f"Skipping {file_path.name} due to analysis error.")
+            continue
+
+        segments = clip_segments(chunks, fps, report)
+        run_report["current"] = report
+        api_calls_before = run_report["api_calls"]
+
+        if is_new_timeline:
+            with timed("timeline"):
+                print("Creating and importing empty timeline...")
+                # the empty timeline is only needed once. writing it ourselves in the clip's
+                # fps and resolution keeps the original fps the video was in.
+                timeline_name = (
+                    f"{project.GetName()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                )
+                xml_timeline_path = scratch_path(f"{timeline_name}.fcpxml")
+                width, height = clip_resolution(clip, file_path)
+                if not write_empty_timeline(
+                    xml_timeline_path, timeline_name, fps, width, height
+                ):
+                    print(f"Skipping {file_path.name} due to XML error.")
+                    continue
+
+                print("Importing new timeline from XML...")
+                new_timeline = media_pool.ImportTimelineFromFile(
+                    str(xml_timeline_path),
+                    {
+                        "timelineName": timeline_name,
+                        "importSourceClips": False,
+                    },
+                )
+                remove_scratch_file(xml_timeline_path)
+
+                if not new_timeline:
+                    print("ERROR: Failed to create new timeline from XML. Skipping...")
+                    continue
+
+                # Update global timeline object to the newly created one
+                project.SetCurrentTimeline(new_timeline)
+                current_timeline = new_timeline
+                # resolve renames the import when the name is taken, the manifest needs the real one
+                timeline_name = new_timeline.GetName()
+                reset_timeline_index()
+                print(f"Successfully created and set timeline: {timeline_name}")
+                is_new_timeline = False
+
+        print("Populating timeline with clips...")
+
+        try:
+            populate_and_color_timeline(
+                segments,
+                clip,
+                DELETE_SILENCE,
+                HIGHLIGHT_COLOR,
+                timeline_offset,
+            )
+        except RuntimeError as e:
+            # not recorded, so ONLY_NEW_CLIPS picks it up again next run
+            print(f"ERROR: {e}")
+            print(f"WARNING: {file_path.name} is not on the timeline.")
+        else:
+            record_processed_clip(manifest, file_path, timeline_name)
+
+        # Increment offset for the next file
+        timeline_offset += int(clip.GetClipProperty("Frames"))
+        report["api_calls"] = run_report["api_calls"] - api_calls_before
+        run_report["current"] = None
+
+        print(f"{file_path.name} processed.\n")
+
+    if CACHE_SIZE_MB:
+        evict_cache()
+    run_report["stages"]["main"] = time.perf_counter() - main_started
+    finish_run_report()
+
+
+# --
+# -- Project manifest
+# --
+def project_manifest_path() -> Path:
+    """Manifest of the clips already cut in the current Resolve project, one file per project in `settings_dir/projects`."""
+    name = project.GetName()
+    safe_name = "".join(c if c.isalnum() or c in "-_. " else "_" for c in name)
+    return settings_dir / "projects" / f"{safe_name}.json"
+
+
+def read_project_manifest() -> dict:
+    """The project manifest: `{"version", "clips": {fingerprint: {"file", "size", "mtime_ns", "cuts": [{"params", "timeline", "processed"}, ...]}}, "timelines": {name: {"params"}}}`, timelines in the order they were last used. An empty one if there is none yet or it can not be read."""
+    empty = {"version": 1, "clips": {}, "timelines": {}}
+    try:
+        with open(project_manifest_path(), "r") as f:
+            manifest = json.load(f)
+    except (OSError, json.decoder.JSONDecodeError):
+        return empty
+    if manifest.get("version") != 1:
+        return empty
+    return manifest
+
+
+def timeline_params() -> dict:
+    """Everything that changes how a clip ends up on the timeline: `detection_params()` plus segment merging, silence deletion and the highlight color."""
+    params = detection_params()
+    params.update(
+        {
+            "DELETE_SILENCE": DELETE_SILENCE,
+            "HIGHLIGHT_COLOR": HIGHLIGHT_COLOR,
+            "MIN_AUDIBLE_SECONDS": MIN_AUDIBLE_SECONDS,
+            "MIN_SILENCE_SECONDS": MIN_SILENCE_SECONDS,
+            "MAX_SEGMENTS_PER_CLIP": MAX_SEGMENTS_PER_CLIP,
+        }
+    )
+    return params
+
+
+def manifest_fingerprint(file_path: Path, manifest: dict) -> str:
+    """`file_fingerprint()` of `file_path`, taken from the manifest without reading the file when its path, size and mtime did not change since it was recorded."""
+    stat = file_path.stat()
+    for fingerprint, entry in manifest["clips"].items():
+        if (
+            entry["file"] == str(file_path)
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return fingerprint
+    return file_fingerprint(file_path)
+
+
+def project_timelines() -> dict:
+    """Timelines of the current project by name."""
+    timelines = {}
+    for i in range(1, (project.GetTimelineCount() or 0) + 1):
+        timeline = project.GetTimelineByIndex(i)
+        if timeline:
+            timelines[timeline.GetName()] = timeline
+    return timelines
+
+
+def select_new_clips(jobs: list, manifest: dict) -> tuple:
+    """Drops the `(clip, file_path, fps, total_frames)` jobs whose media is already on a timeline of this project with the current `timeline_params()`. Returns the remaining jobs and the generated timeline they can be appended to: the one used last with the same settings if it still exists, otherwise None."""
+    params = timeline_params()
+    timelines = project_timelines()
+    remaining = []
+    for job in jobs:
+        try:
+            entry = manifest["clips"].get(manifest_fingerprint(job[1], manifest))
+        except OSError:
+            entry = None
+        cuts = entry["cuts"] if entry else []
+        if any(
+            cut["params"] == params and cut["timeline"] in timelines for cut in cuts
+        ):
+            continue
+        remaining.append(job)
+
+    for name, timeline_entry in reversed(list(manifest["timelines"].items())):
+        if timeline_entry["params"] == params and name in timelines:
+            return remaining, timelines[name]
+    return remaining, None
+
+
+def record_processed_clip(manifest: dict, file_path: Path, timeline_name: str):
+    """Notes in the project manifest that `file_path` was cut into `timeline_name` with the current settings and saves it."""
+    params = timeline_params()
+    try:
+        stat = file_path.stat()
+        fingerprint = manifest_fingerprint(file_path, manifest)
+    except OSError as e:
+        print(f"WARNING: could not add {file_path.name} to the project manifest: {e}")
+        return
+    entry = manifest["clips"].setdefault(fingerprint, {"cuts": []})
+    entry.update(
+        {"file": str(file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    )
+    # a clip is on a timeline once, an update replaces what it was cut with there
+    entry["cuts"] = [cut for cut in entry["cuts"] if cut["timeline"] != timeline_name]
+    entry["cuts"].append(
+        {
+            "params": params,
+            "timeline": timeline_name,
+            "processed": datetime.now().isoformat(timespec="seconds"),
+        }
+    )
+    # most recently used timeline last
+    manifest["timelines"].pop(timeline_name, None)
+    manifest["timelines"][timeline_name] = {"params": params}
+    manifest_path = project_manifest_path()
+    try:
+        manifest_path.parent.mkdir(exist_ok=True)
+        write_json_atomic(manifest_path, manifest)
+    except OSError as e:
+        print(f"WARNING: could not save the project manifest: {e}")
+
+
+def find_media_folder(root_folder, folder_path: str):
+    """The media pool folder at `folder_path` below the master folder ("Interviews" or "Day 1/Interviews"), the master folder itself for "". None if there is no such folder."""
+    folder = root_folder
+    for name in filter(None, folder_path.replace("\\", "/").split("/")):
+        for subfolder in folder.GetSubFolderList() or []:
+            if subfolder.GetName() == name:
+                folder = subfolder
+                break
+        else:
+            return None
+    return folder
+
+
+# --
+# -- Timeline update
+# --
+def timeline_to_update(manifest: dict):
+    """The generated timeline an update works on: the current timeline if the script made it, otherwise the one it used last. None, with the reason printed, if there is none or silence is deleted on it, where every change would move everything after it."""
+    timelines = project_timelines()
+    name = None
+    if current_timeline:
+        current_name = current_timeline.GetName()
+        if current_name in manifest["timelines"] and current_name in timelines:
+            name = current_name
+    if name is None:
+        for manifest_name in reversed(list(manifest["timelines"])):
+            if manifest_name in timelines:
+                name = manifest_name
+                break
+    if name is None:
+        print("No timeline from an earlier run found, making a new one.")
+        return None
+    if DELETE_SILENCE or manifest["timelines"][name]["params"]["DELETE_SILENCE"]:
+        print(
+            "Timelines without the silence can not be updated in place, making a new one."
+        )
+        return None
+    return timelines[name]
+
+
+def recut_clip(
+    segments: Segments, clip, video_items: list, audio_items_by_start: dict
+) -> dict:
+    """Brings the items of one clip on the current timeline in line with its new `segments`. Items that still match a segment exactly stay and only get their color fixed, the others are deleted and the new segments in their place are added at the same timeline position. Returns the counts `{"kept", "deleted", "inserted", "missing", "recolored"}`, where `missing` segments could not be inserted again after their old items were deleted, or None if the items were moved or trimmed by hand and the clip was left alone.
+
+    The silence stays on these timelines, so the items of a clip cover its whole source and every source frame keeps its timeline position: nothing outside the changed regions has to move.
+    """
+    total_source_frames = int(clip.GetClipProperty("Frames"))
+    ends = segments.ends.tolist()
+    ends[-1] = total_source_frames
+    wanted = {
+        (start_frame, end_frame): is_audible
+        for start_frame, end_frame, is_audible in zip(
+            segments.starts.tolist(), ends, segments.audible.tolist()
+        )
+    }
+
+    starts = [item.GetStart() for item in video_items]
+    left_offsets = [item.GetLeftOffset() for item in video_items]
+    durations = [item.GetDuration() for item in video_items]
+    colors = [item.GetClipColor() for item in video_items]
+    # timeline frame of the clip's first source frame, the same for every untouched item
+    record_starts = {start - left for start, left in zip(starts, left_offsets)}
+    if len(record_starts) != 1:
+        return None
+    record_start = record_starts.pop()
+
+    counts = {"kept": 0, "deleted": 0, "inserted": 0, "missing": 0, "recolored": 0}
+    to_delete = []
+    kept = set()
+    for video_item, start, left, duration, color in zip(
+        video_items, starts, left_offsets, durations, colors
+    ):
+        linked_items = [video_item] + audio_items_by_start.get(start, [])
+        span = (left, left + duration)
+        if span not in wanted:
+            to_delete.extend(linked_items)
+            counts["deleted"] += 1
+            continue
+
+        kept.add(span)
+        counts["kept"] += 1
+        if wanted[span] and color != HIGHLIGHT_COLOR:
+            for item in linked_items:
+                item.SetClipColor(HIGHLIGHT_COLOR)
+            counts["recolored"] += 1
+        elif not wanted[span] and color:
+            for item in linked_items:
+                item.ClearClipColor()
+            counts["recolored"] += 1
+
+    if to_delete:
+        current_timeline.DeleteClips(to_delete, False)
+
+    clips_to_insert = [
+        {
+            "mediaPoolItem": clip,
+            "startFrame": start_frame,
+            "endFrame": end_frame,
+            "recordFrame": record_start + start_frame,
+        }
+        for (start_frame, end_frame) in wanted
+        if (start_frame, end_frame) not in kept
+    ]
+    if clips_to_insert:
+        # video and audio items come back together, both get the segment's color
+        inserted = media_pool.AppendToTimeline(clips_to_insert) or []
+        # an item is audible when its first source frame falls into an audible segment
+        left_offsets = [item.GetLeftOffset() for item in inserted]
+        for item, is_audible in zip(inserted, segments.audible_at(left_offsets)):
+            if is_audible:
+                item.SetClipColor(HIGHLIGHT_COLOR)
+        # the old items are already gone, whatever did not land leaves a gap
+        landed = set(left_offsets)
+        counts["inserted"] = sum(
+            1 for clip_info in clips_to_insert if clip_info["startFrame"] in landed
+        )
+        counts["missing"] = len(clips_to_insert) - counts["inserted"]
+        if counts["missing"]:
+            print(
+                f"ERROR: Failed to insert {counts['missing']} of {len(clips_to_insert)} changed segments."
+            )
+    return counts
+
+
+def update_timeline(timeline, jobs: list, manifest: dict, edit_param: str):
+    """Re-cuts `timeline` from an earlier run with the current settings instead of building a new one. Clips that are already cut with these settings are not even analyzed, the others are changed in place with `recut_clip()`, clips that are not on it yet go to its end."""
+    global current_timeline
+    project.SetCurrentTimeline(timeline)
+    current_timeline = timeline
+    timeline_name = timeline.GetName()
+    print(f"Updating timeline: {timeline_name}")
+    params = timeline_params()
+
+    with timed("timeline"):
+        video_items_by_media = {}
+        for item in timeline.GetItemListInTrack("video", 1) or []:
+            media_id = item.GetMediaPoolItem().GetMediaId()
+            video_items_by_media.setdefault(media_id, []).append(item)
+        audio_items_by_start = {}
+        audio_tracks = timeline.GetTrackCount("audio")
+        for i in range(1, audio_tracks + 1):
+            for item in timeline.GetItemListInTrack("audio", i) or []:
+                audio_items_by_start.setdefault(item.GetStart(), []).append(item)
+
+    # only clips whose settings changed need analyzing
+    changed_jobs = []
+    for job in jobs:
+        media_id = job[0].GetMediaId()
+        try:
+            entry = manifest["clips"].get(manifest_fingerprint(job[1], manifest))
+        except OSError:
+            entry = None
+        cuts = entry["cuts"] if entry else []
+        if media_id in video_items_by_media and any(
+            cut["timeline"] == timeline_name and cut["params"] == params for cut in cuts
+        ):
+            continue
+        changed_jobs.append((job, media_id))
+    print(f"{len(jobs) - len(changed_jobs)} of {len(jobs)} clip(s) need no changes.")
+
+    reports = [clip_report(job[1]) for job, _ in changed_jobs]
+    results = iter_analysis_results(
+        [job for job, _ in changed_jobs], reports, edit_param
+    )
+    new_clips = []
+    for (job, media_id), chunks, report in zip(changed_jobs, results, reports):
+        clip, file_path, fps, _ = job
+        if chunks is None:
+            print(f"Skipping {file_path.name} due to analysis error.")
+            continue
+        segments = clip_segments(chunks, fps, report)
+        if media_id not in video_items_by_media:
+            new_clips.append((clip, file_path, segments, report))
+            continue
+
+        print(f"Updating {file_path.name}...")
+        run_report["current"] = report
+        api_calls_before = run_report["api_calls"]
+        with timed("append"):
+            counts = recut_clip(
+                segments, clip, video_items_by_media[media_id], audio_items_by_start
+            )
+        report["api_calls"] = run_report["api_calls"] - api_calls_before
+        run_report["current"] = None
+        if counts is None:
+            print(
+                f"WARNING: {file_path.name} was edited on the timeline, leaving it as it is."
+            )
+            continue
+        report["appended"] = counts["inserted"]
+        print(
+            f"{file_path.name}: {counts['kept']} clips kept, {counts['deleted']} replaced by {counts['inserted']}, {counts['recolored']} recolored."
+        )
+        if counts["missing"]:
+            # not recorded, so the next update run fills the gap
+            print(f"WARNING: {file_path.name} has gaps on the timeline.")
+            continue
+        record_processed_clip(manifest, file_path, timeline_name)
+
+    # inserts in the middle would confuse the index, so new clips are appended at the end
+    if new_clips:
+        index_existing_timeline()
+    for clip, file_path, segments, report in new_clips:
+        print(f"Appending {file_path.name} to the end...")
+        run_report["current"] = report
+        api_calls_before = run_report["api_calls"]
+        try:
+            populate_and_color_timeline(
+                segments, clip, DELETE_SILENCE, HIGHLIGHT_COLOR, 0
+            )
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            print(f"WARNING: {file_path.name} is not on the timeline.")
+        else:
+            record_processed_clip(manifest, file_path, timeline_name)
+        report["api_calls"] = run_report["api_calls"] - api_calls_before
+        run_report["current"] = None
+
+    if CACHE_SIZE_MB:
+        evict_cache()
+
+
+# --
+# -- Warm analysis processes
+# --
+def analysis_python() -> str:
+    """The python that runs the analysis helper processes, it needs auto-editor installed."""
+    if ANALYSIS_PYTHON:
+        return ANALYSIS_PYTHON
+    # outside of resolve the script already runs in a python that found auto-editor
+    if Path(sys.executable or "").name.lower().startswith("python"):
+        return sys.executable
+    names = ("python", "python3") if os.name == "nt" else ("python3", "python")
+    for name in names:
+        python = shutil.which(name)
+        if python:
+            return python
+    return None
+
+
+def start_analysis_server():
+    """
+    Starts this script as an analysis helper process (the `serve` command) and waits
+    until it has auto-editor loaded. Returns the process, or None when that does not
+    work, e.g. without a python that can import auto-editor.
+    """
+    script = globals().get("__file__")
+    if not script:
+        print("The script's location is unknown, auto-editor runs once per clip.")
+        return None
+    python = analysis_python()
+    if not python:
+        print("No python found for the analysis processes, see ANALYSIS_PYTHON.")
+        return None
+
+    try:
+        server = subprocess.Popen(
+            [python, str(Path(script).resolve()), "serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            bufsize=1,
+            creationflags=CREATE_NO_WINDOW,
+        )
+    except OSError as e:
+        print(f"Could not start an analysis process with {python}: {e}")
+        return None
+    # a helper that hangs while loading auto-editor would block this and every thread
+    # waiting on analysis_servers_lock for good
+    hello_line = readline_within(server.stdout, ANALYSIS_START_TIMEOUT)
+    if hello_line is None:
+        hello = {"error": f"no reply within {ANALYSIS_START_TIMEOUT}s"}
+    else:
+        try:
+            hello = json.loads(hello_line or "{}")
+        except ValueError:
+            hello = {"error": "unexpected reply"}
+        if not isinstance(hello, dict):
+            hello = {"error": "unexpected reply"}
+
+    if not hello.get("ready"):
+        print(
+            f"auto-editor can't be loaded by {python} ({hello.get('error', 'no reply')}), it runs once per clip instead."
+        )
+        server.kill()
+        server.wait()
+        return None
+    return server
+
+
+def readline_within(stream, seconds: float):
+    """The next line of `stream`, or None when none came within `seconds`. readline() has no timeout of its own, so it runs on a thread that is left waiting when it hangs, it ends once the process on the other side is killed."""
+    lines = []
+    reader = threading.Thread(
+        target=lambda: lines.append(stream.readline()), daemon=True
+    )
+    reader.start()
+    reader.join(seconds)
+    if reader.is_alive():
+        return None
+    return lines[0]
+
+
+def borrow_analysis_server():
+    """
+    An idle analysis process for the calling thread, started on first use. Give it
+    back with `release_analysis_server()`. Returns None when the processes can't run,
+    then auto-editor is started per clip like before.
+    """
+    with analysis_servers_lock:
+        if analysis_servers["available"] is False:
+            return None
+        if analysis_servers["idle"]:
+            return analysis_servers["idle"].pop()
+        if analysis_servers["available"] is None:
+            # the first start finds out if it works at all, the other threads wait for it
+            server = start_analysis_server()
+            analysis_servers["available"] = server is not None
+            if server is not None:
+                analysis_servers["running"].append(server)
+            return server
+
+    # one process per analysis thread, so the others start side by side
+    server = start_analysis_server()
+    if server is not None:
+        with analysis_servers_lock:
+            analysis_servers["running"].append(server)
+    return server
+
+
+def release_analysis_server(server):
+    """Hands `server` back for the next clip, see `borrow_analysis_server()`."""
+    with analysis_servers_lock:
+        if server in analysis_servers["running"]:
+            analysis_servers["idle"].append(server)
+
+
+def discard_analysis_server(server):
+    """Stops an analysis process that stopped answering, the next clip gets a new one."""
+    with analysis_servers_lock:
+        if server in analysis_servers["running"]:
+            analysis_servers["running"].remove(server)
+    server.kill()
+    server.wait()
+
+
+def stop_analysis_servers():
+    """Stops the analysis processes of this run, each one finishes its current clip first."""
+    with analysis_servers_lock:
+        servers = analysis_servers["running"]
+        analysis_servers.update(available=None, idle=[], running=[])
+
+    for server in servers:
+        try:
+            server.stdin.close()
+        except OSError:
+            pass
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def server_analyze(server, args: list, v1_path: Path) -> list:
+    """Has `server` run auto-editor with `args` (everything after the program name) and returns its chunks, or None when auto-editor failed. Raises OSError when the process itself is gone or took longer than ANALYSIS_CLIP_TIMEOUT, and ValueError on a reply it can't read."""
+    request = {"args": args, "output": str(v1_path), "cwd": str(v1_path.parent)}
+    server.stdin.write(json.dumps(request) + "\n")
+    server.stdin.flush()
+    reply = readline_within(server.stdout, ANALYSIS_CLIP_TIMEOUT)
+    if reply is None:
+        # the caller kills it and runs auto-editor on its own
+        raise TimeoutError(f"no reply within {ANALYSIS_CLIP_TIMEOUT}s")
+    if not reply:
+        raise OSError("the analysis process exited")
+
+    try:
+        chunks = json.loads(reply)["chunks"]
+        if chunks is None:
+            return None
+        return [
+            (start_frame, end_frame, is_audible)
+            for start_frame, end_frame, is_audible in chunks
+        ]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"unexpected reply {reply.strip()[:80]!r}") from e
+
+
+def serve_analysis():
+    """
+    The `serve` command: imports auto-editor once and then runs it in this process
+    for every request, one JSON line on stdin each, answering with the chunks of the
+    clip on stdout. Ends when stdin is closed.
+    """
+    # stdout only carries replies, everything auto-editor and ffmpeg print goes to stderr
+    sys.stdout.flush()
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    try:
+        from auto_editor.__main__ import main as auto_editor_main
+    except Exception as e:
+        replies.write(json.dumps({"ready": False, "error": str(e)}) + "\n")
+        return
+    replies.write(json.dumps({"ready": True}) + "\n")
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        v1_path = Path(request["output"])
+        os.chdir(request["cwd"])
+        sys.argv = ["auto-editor"] + request["args"]
+        try:
+            auto_editor_main()
+        except SystemExit:
+            # auto-editor exits when it is done or failed, a missing export tells which
+            pass
+        except Exception as e:
+            print(f"auto-editor failed on {request['args'][0]}: {e}")
+
+        chunks = load_v1_chunks(v1_path)
+        remove_scratch_file(v1_path)
+        replies.write(json.dumps({"chunks": chunks}) + "\n")
+
+
+# --
+# -- Headless analysis
+# --
+# file types the analyze command picks up from folders
+MEDIA_EXTENSIONS = {
+    ".mp4",
+    ".mov",
+    ".mkv",
+    ".mxf",
+    ".avi",
+    ".m4v",
+    ".mts",
+    ".webm",
+    ".wav",
+    ".mp3",
+    ".m4a",
+    ".aac",
+    ".flac",
+}
+
+
+def collect_media(paths: list, recursive: bool) -> list:
+    """Expands folders in `paths` to the media files inside them, files are kept as they are."""
+    media = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found = path.rglob("*") if recursive else path.iterdir()
+            media.extend(
+                sorted(
+                    f
+                    for f in found
+                    if f.is_file() and f.suffix.lower() in MEDIA_EXTENSIONS
+                )
+            )
+        elif path.is_file():
+            media.append(path)
+        else:
+            print(f"{path} does not exist, skipping.")
+    return media
+
+
+def media_jobs(paths: list, recursive: bool, fallback_fps: float) -> list:
+    """`(file_path, fps, total_frames)` of the media in `paths` that has the selected audio tracks, probed without Resolve."""
+    jobs = []
+    for file_path in collect_media(paths, recursive):
+        info = probe_media(file_path)
+        if info is None or not info["audio_streams"]:
+            print(f"Skipping {file_path.name}, no audio found.")
+            continue
+        if USE_AUDIO_TRACKS and max(USE_AUDIO_TRACKS) >= len(info["audio_streams"]):
+            print(
+                f"Skipping {file_path.name}, it has only {len(info['audio_streams'])} audio track(s)."
+            )
+            continue
+        # audio only files have no frame rate of their own, resolve uses the project's
+        fps = info["fps"] or fallback_fps
+        total_frames = int((info["duration"] or 0) * fps)
+        jobs.append((file_path, fps, total_frames))
+    return jobs
+
+
+def run_analyze_command(paths: list, recursive: bool, fallback_fps: float):
+    """Analyzes media outside of Resolve and writes a segment manifest next to each file. The next run inside Resolve finds them and skips straight to building the timeline."""
+    start_run_report()
+    jobs = media_jobs(paths, recursive, fallback_fps)
+    if not jobs:
+        print("Nothing to analyze.")
+        return
+
+    edit_param = auto_editor_edit_param()
+    reports = [clip_report(job[0]) for job in jobs]
+    workers = ANALYSIS_WORKERS or os.cpu_count() or 1
+    print(f"Analyzing {len(jobs)} file(s) with {min(workers, len(jobs))} worker(s)...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda job, report: analyze_clip(*job, edit_param, report),
+                jobs,
+                reports,
+            )
+        )
+    if CACHE_SIZE_MB:
+        evict_cache()
+
+    failed = 0
+    for (file_path, fps, total_frames), chunks, report in zip(jobs, results, reports):
+        if chunks is None:
+            print(f"{file_path.name} could not be analyzed.")
+            failed += 1
+            continue
+        report["segments"] = len(chunks)
+        report["audible_segments"] = sum(1 for chunk in chunks if chunk[2])
+        if not report.get("manifest"):
+            write_manifest(
+                file_path, file_fingerprint(file_path), fps, total_frames, chunks
+            )
+    print()
+    finish_run_report()
+    print(f"{len(jobs) - failed} segment manifest(s) ready, {failed} failed.")
+
+
+# --
+# -- Job queue
+# --
+# a job moves pending/ -> claimed/ -> done/ inside JOB_QUEUE_DIR. claiming is an atomic rename,
+# so only one worker gets each job, and every change of the claimed file's mtime is a heartbeat.
+# the mtime is only compared with the one seen before, never with a clock, as the worker's
+# clock (or the nas's) need not agree with the one of the machine running resolve.
+JOB_POLL_SECONDS = 0.5
+JOB_HEARTBEAT_SECONDS = 5
+
 
+def queue_dirs(queue_dir: Path) -> tuple:
+    """Returns (and creates) the `pending`, `claimed` and `done` folders of a job queue."""
+    dirs = tuple(queue_dir / name for name in ("pending", "claimed", "done"))
+    for folder in dirs:
+        folder.mkdir(parents=True, exist_ok=True)
+    return dirs
 
-def construct_checkboxes(audio_tracks: int):
-    """Constructs the checkboxes in the GUI for the count of audio tracks"""
-    checkbox_group = []
 
-    for track in range(audio_tracks):
-        checkbox = ui.CheckBox(
-            {
-                "ID": f"checkbox_{track}",
-                "Text": f"Track {track + 1}",
-                "Checked": True if track in USE_AUDIO_TRACKS else False,
-            }
-        )
-        checkbox_group.append(checkbox)
+def write_json_atomic(target: Path, data: dict):
+    """Writes `data` next to `target` first and renames it into place, so readers never see half a file."""
+    tmp_file = target.with_name(
+        f".{target.name}.{socket.gethostname()}.{os.getpid()}.tmp"
+    )
+    with open(tmp_file, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_file, target)
 
-    return checkbox_group
+
+def claim_job(pending_file: Path, claimed_dir: Path, worker_id: str) -> Path:
+    """Moves a pending job to `claimed_dir` under `worker_id`. Returns the claimed file, or None if somebody else was faster."""
+    claimed_file = claimed_dir / f"{pending_file.stem}.{worker_id}.json"
+    try:
+        os.rename(pending_file, claimed_file)
+    except OSError:
+        return None
+    # the rename keeps the submit time, the heartbeat starts now
+    os.utime(claimed_file)
+    return claimed_file
 
 
-def populate_and_color_timeline(
-    all_clips_json_path: Path,
-    audible_clips_json_path: Path,
-    source_clip,
-    delete_silence: bool,
-    highlight_color: str,
-    timeline_offset: int,
-):
-    """
-    Populates the timeline using a comprehensive JSON and colors audible clips
-    regardless of the delete_silence setting.
+def run_job_queue(jobs: list, reports: list, on_result=None) -> list:
+    """Analyzes the `(clip, file_path, fps, total_frames)` jobs through the shared job queue in `JOB_QUEUE_DIR` and returns their chunks in clip order, None for failed clips. `on_result(i, chunks)` is called as soon as the result of job `i` is final, in whatever order the workers finish.
+
+    Clips with a segment manifest or cache entry are not submitted. A claimed job whose worker stops sending heartbeats for `JOB_TIMEOUT` seconds is put back in the queue, a job nobody picks up within `JOB_TIMEOUT` is analyzed here. Both are timed on this machine's clock only, see the comment above.
     """
-    try:
-        with open(all_clips_json_path, "r") as f:
-            all_clips_data = json.load(f)
-        with open(audible_clips_json_path, "r") as f:
-            audible_clips_data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error reading JSON files: {e}")
-        return False
 
-    # Create a set of audible source offsets for quick lookup
-    audible_offsets = {clip["offset"] for clip in audible_clips_data.get("v", [[]])[0]}
+    pending_dir, claimed_dir, done_dir = queue_dirs(Path(JOB_QUEUE_DIR))
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{socket.gethostname()}-{os.getpid()}"
+    local_id = f"{socket.gethostname()}-{os.getpid()}"
+    results = [None] * len(jobs)
+    waiting = {}
+    fingerprints = {}
+    # job_id -> local time.monotonic() it went into pending/
+    pending_since = {}
+    # job_id -> (claimed file name, its mtime, local time.monotonic() that mtime was first seen)
+    last_beats = {}
 
-    video_clips_to_process = all_clips_data.get("v", [[]])
-    if not video_clips_to_process or not video_clips_to_process[0]:
-        print("No video clips found in the main JSON file.")
-        return True
+    def finish(i: int, chunks: list):
+        results[i] = chunks
+        if on_result is not None:
+            on_result(i, chunks)
 
-    total_source_frames = int(source_clip.GetClipProperty("Frames"))
-    clips_to_append = []
+    for i, ((_, file_path, fps, total_frames), report) in enumerate(zip(jobs, reports)):
+        job_id = f"{run_id}-{i:04d}"
+        try:
+            chunks, fingerprint = find_analysis(file_path, fps, total_frames, report)
+            if chunks is not None:
+                finish(i, chunks)
+                continue
+            fingerprint = fingerprint or file_fingerprint(file_path)
+            write_json_atomic(
+                pending_dir / f"{job_id}.json",
+                {
+                    "version": 1,
+                    "file": str(file_path),
+                    "fingerprint": fingerprint,
+                    "fps": fps,
+                    "total_frames": total_frames,
+                    "params": detection_params(),
+                    "timeout": JOB_TIMEOUT,
+                },
+            )
+        except OSError as e:
+            # an offline clip only fails itself, the rest of the run goes on
+            print(f"Could not submit {file_path.name}: {e}")
+            finish(i, None)
+            continue
+        fingerprints[job_id] = fingerprint
+        pending_since[job_id] = time.monotonic()
+        report["job_started"] = time.perf_counter()
+        waiting[job_id] = i
 
-    num_clips = len(video_clips_to_process[0])
-    for i, clip_data in enumerate(video_clips_to_process[0]):
-        start_frame = clip_data["offset"]
-        is_audible = start_frame in audible_offsets
+    if waiting:
+        print(f"Submitted {len(waiting)} clip(s) to the job queue in {JOB_QUEUE_DIR}")
 
-        # Decide whether to append the clip
-        if not delete_silence or (delete_silence and is_audible):
-            if i == num_clips - 1:
-                end_frame = total_source_frames
-            else:
-                end_frame = start_frame + clip_data["dur"]
+    while waiting:
+        now = time.monotonic()
+        for job_id, i in list(waiting.items()):
+            _, file_path, fps, total_frames = jobs[i]
+            report = reports[i]
 
-            new_clip = {
-                "mediaPoolItem": source_clip,
-                "startFrame": start_frame,
-                "endFrame": end_frame,
-            }
-            clips_to_append.append(new_clip)
+            done_file = done_dir / f"{job_id}.json"
+            if done_file.exists():
+                try:
+                    with open(done_file, "r") as f:
+                        result = json.load(f)
+                except (OSError, json.decoder.JSONDecodeError):
+                    continue
+                done_file.unlink()
+                del waiting[job_id]
+                last_beats.pop(job_id, None)
+                report["stages"]["analysis"] = time.perf_counter() - report.pop(
+                    "job_started"
+                )
+                if "error" in result:
+                    print(
+                        f"{file_path.name} failed on {result['worker']}: {result['error']}"
+                    )
+                    finish(i, None)
+                    continue
+                chunks = [tuple(chunk) for chunk in result["chunks"]]
+                report["worker"] = result["worker"]
+                print(f"{file_path.name} analyzed by {result['worker']}.")
+                if CACHE_SIZE_MB:
+                    params = chunk_params(fps, total_frames)
+                    write_cache(
+                        cache_key(fingerprints[job_id], params),
+                        fingerprints[job_id],
+                        params,
+                        chunks,
+                    )
+                finish(i, chunks)
+                continue
 
-    if not clips_to_append:
-        print("No clips to append after processing.")
-        return True
+            for claimed_file in claimed_dir.glob(f"{job_id}.*.json"):
+                try:
+                    beat = (claimed_file.name, claimed_file.stat().st_mtime_ns)
+                except OSError:
+                    continue
+                if last_beats.get(job_id, (None, None))[:2] != beat:
+                    last_beats[job_id] = beat + (now,)
+                idle = now - last_beats[job_id][2]
+                if idle > JOB_TIMEOUT:
+                    print(
+                        f"No heartbeat for {file_path.name} in {idle:.0f}s, re-queueing it."
+                    )
+                    del last_beats[job_id]
+                    try:
+                        os.rename(claimed_file, pending_dir / f"{job_id}.json")
+                    except OSError:
+                        continue
+                    pending_since[job_id] = now
 
-    # Get the number of items on the video track before appending
-    item_count_before_append = len(
-        current_timeline.GetItemListInTrack("video", 1) or []
-    )
+            # nobody picked the job up in time, do it here
+            pending_file = pending_dir / f"{job_id}.json"
+            unclaimed = (
+                now - pending_since[job_id] > JOB_TIMEOUT and pending_file.exists()
+            )
+            if unclaimed:
+                claimed_file = claim_job(pending_file, claimed_dir, local_id)
+                if claimed_file is not None:
+                    print(f"No worker took {file_path.name}, analyzing it here.")
+                    del waiting[job_id]
+                    report.pop("job_started")
+                    chunks = analyze_clip(
+                        *jobs[i][1:], auto_editor_edit_param(), report
+                    )
+                    try:
+                        claimed_file.unlink()
+                    except FileNotFoundError:
+                        pass
+                    finish(i, chunks)
 
-    print(f"Appending {len(clips_to_append)} clips...")
-    if not media_pool.AppendToTimeline(clips_to_append):
-        print("ERROR: Failed to append clips to timeline.")
-        return False
+        if waiting:
+            time.sleep(JOB_POLL_SECONDS)
 
-    print("Coloring audible clips...")
-    video_items_after = current_timeline.GetItemListInTrack("video", 1) or []
-    new_video_items = video_items_after[item_count_before_append:]
+    return results
 
-    # Create a lookup for audio items by their timeline start frame for efficiency
-    audio_items_by_start = {}
-    for i in range(1, current_timeline.GetTrackCount("audio") + 1):
-        for item in current_timeline.GetItemListInTrack("audio", i) or []:
-            audio_items_by_start.setdefault(item.GetStart(), []).append(item)
 
-    for video_item in new_video_items:
-        # GetLeftOffset() gives the frame offset from the start of the source media
-        source_start_frame = video_item.GetLeftOffset()
-        if source_start_frame in audible_offsets:
-            # Color the video clip
-            video_item.SetClipColor(highlight_color)
+def process_job(claimed_file: Path, worker_id: str, path_map: list) -> dict:
+    """Runs one claimed job with the detection settings it was submitted with and returns its result."""
+    with open(claimed_file, "r") as f:
+        job = json.load(f)
 
-            # Find and color corresponding audio clips using the lookup
-            timeline_start_frame = video_item.GetStart()
-            if timeline_start_frame in audio_items_by_start:
-                for audio_item in audio_items_by_start[timeline_start_frame]:
-                    audio_item.SetClipColor(highlight_color)
-    return True
+    file_name = job["file"]
+    for source, target in path_map:
+        if file_name.startswith(source):
+            file_name = target + file_name[len(source) :]
+            break
+    file_path = Path(file_name)
 
+    if job.get("version") != 1:
+        return {"worker": worker_id, "error": "unsupported job version"}
+    if not file_path.exists():
+        return {"worker": worker_id, "error": f"{file_path} not found (see --path-map)"}
+    if file_fingerprint(file_path) != job["fingerprint"]:
+        return {"worker": worker_id, "error": f"{file_path} is not the submitted file"}
 
-def main():
-    # flow of main():
-    # 1. Generate assets using auto-editor (XML and V3 JSONs)
-    # 2. Sanitize XML and import it to create a new, empty timeline
-    # 3. Parse V3 JSON and append clips to the new timeline
+    params = job["params"]
+    if params["ANALYSIS_BACKEND"] == "numpy" and np is None:
+        return {"worker": worker_id, "error": "numpy is not installed on this worker"}
 
-    is_new_timeline = True
-    timeline_offset = 0
+    # the submitted settings decide the result, not this worker's settings.json
+    global GATE_DB, USE_AUDIO_TRACKS, L_TRIM_MARGIN, R_TRIM_MARGIN
+    global ANALYSIS_BACKEND, LOUDNESS_MEASURE, TRACK_GATE_DB
+    global REDUCED_SAMPLE_RATE, REDUCED_RATE_MINUTES
+    GATE_DB = params["GATE_DB"]
+    USE_AUDIO_TRACKS = params["USE_AUDIO_TRACK"]
+    L_TRIM_MARGIN = params["L_TRIM_MARGIN"]
+    R_TRIM_MARGIN = params["R_TRIM_MARGIN"]
+    ANALYSIS_BACKEND = params["ANALYSIS_BACKEND"]
+    LOUDNESS_MEASURE = params["LOUDNESS_MEASURE"]
+    TRACK_GATE_DB = params.get("TRACK_GATE_DB", {})
+    REDUCED_SAMPLE_RATE = params.get("REDUCED_SAMPLE_RATE", 0)
+    REDUCED_RATE_MINUTES = params.get("REDUCED_RATE_MINUTES", 0)
 
-    # Formatting for auto-editor is different for 1+ audio streams
-    if len(USE_AUDIO_TRACKS) == 1:
-        # Using sugary syntax, e.g., "audio:-20dB,stream=0"
-        edit_param = f"audio:{GATE_DB}dB,stream={USE_AUDIO_TRACKS[0]}"
-    else:
-        # For multiple tracks, we must use a palet expression.
-        # The palet 'audio' function requires a linear threshold (0.0 to 1.0),
-        # not a dB value. We convert the dB value to a linear amplitude value.
-        # Formula: amplitude = 10^(dB / 20)
-        try:
-            threshold = 10 ** (GATE_DB / 20)
-        except (ValueError, OverflowError):
-            # Fallback to a sensible default if conversion fails
-            print(
-                f"Warning: Could not convert GATE_DB value '{GATE_DB}' to a linear threshold. Using default."
-            )
-            threshold = 0.1  # Corresponds to -20dB
+    chunks = analyze_clip(
+        file_path,
+        job["fps"],
+        job["total_frames"],
+        auto_editor_edit_param(),
+        clip_report(file_path),
+    )
+    if chunks is None:
+        return {"worker": worker_id, "error": "analysis failed"}
+    return {"worker": worker_id, "chunks": chunks}
 
-        # Using palet expression syntax, e.g., "(or (audio 0.1 #:stream 0) (audio 0.1 #:stream 1))"
-        streams = " ".join(
-            f"audio:{threshold},stream={stream}" for stream in USE_AUDIO_TRACKS
-        )
-        edit_param = f"(or {streams})"
 
-    for clip_idx, clip in enumerate(clips):
-        file_path = clip.GetClipProperty()["File Path"]
-        if not file_path:
+def run_worker(queue_dir: Path, path_map: list, idle_exit: float):
+    """Claims and analyzes jobs from `queue_dir` until stopped, or until there was nothing to do for `idle_exit` seconds."""
+    pending_dir, claimed_dir, done_dir = queue_dirs(queue_dir)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Worker {worker_id} waiting for jobs in {queue_dir}")
+    idle_since = time.monotonic()
+
+    while True:
+        claimed_file = None
+        # oldest run first, then in clip order
+        for pending_file in sorted(pending_dir.glob("*.json")):
+            claimed_file = claim_job(pending_file, claimed_dir, worker_id)
+            if claimed_file is not None:
+                break
+
+        if claimed_file is None:
+            if idle_exit and time.monotonic() - idle_since > idle_exit:
+                print(f"Worker {worker_id} idle for {idle_exit:.0f}s, exiting.")
+                return
+            time.sleep(JOB_POLL_SECONDS)
             continue
 
-        file_path = Path(file_path)
-        print(f"Processing {file_path.name} at: {file_path.parent}")
+        job_id = claimed_file.name[: -len(f".{worker_id}.json")]
+        stop_heartbeat = threading.Event()
+        try:
+            with open(claimed_file, "r") as f:
+                timeout = json.load(f).get("timeout", JOB_TIMEOUT)
+        except (OSError, json.decoder.JSONDecodeError):
+            timeout = JOB_TIMEOUT
+        # several beats per timeout, so one slow write on the nas does not look like a dead worker
+        interval = min(JOB_HEARTBEAT_SECONDS, timeout / 4)
 
-        common_flags = [
-            "auto-editor",
-            str(file_path),
-            "--edit",
-            edit_param,
-            "--margin",
-            f"{L_TRIM_MARGIN}s,{R_TRIM_MARGIN}s",
-        ]
+        def heartbeat():
+            while not stop_heartbeat.wait(interval):
+                try:
+                    os.utime(claimed_file)
+                except OSError:
+                    # re-queued by the resolve side, finishing it anyway does no harm
+                    pass
 
-        print("Generating Resolve FCPXML timeline...")
-        xml_timeline_path = file_path.with_suffix(".fcpxml")
-        resolve_flags = common_flags + [
-            "--export",
-            "resolve",
-            "--output",
-            str(xml_timeline_path),
-        ]
-        subprocess.run(
-            resolve_flags,
-            cwd=str(file_path.parent),
-            creationflags=subprocess.CREATE_NO_WINDOW,
-        )
-
-        print("Generating V3 JSON for all clips...")
-        json_path_all_clips = file_path.with_name(f"{file_path.stem}_all_clips.v3")
-        all_clips_flags = common_flags + [
-            "--export",
-            "v3",
-            "--video-speed",
-            "1",
-            "--silent-speed",
-            "1",
-            "--output",
-            str(json_path_all_clips),
-        ]
-        subprocess.run(
-            all_clips_flags,
-            cwd=str(file_path.parent),
-            creationflags=subprocess.CREATE_NO_WINDOW,
-        )
-
-        print("Generating V3 JSON for audible clips...")
-        json_path_audible_clips = file_path.with_name(
-            f"{file_path.stem}_audible_clips.v3"
-        )
-        audible_clips_flags = common_flags + [
-            "--export",
-            "v3",
-            "--video-speed",
-            "1",
-            "--output",
-            str(json_path_audible_clips),
-        ]
-        subprocess.run(
-            audible_clips_flags,
-            cwd=str(file_path.parent),
-            creationflags=subprocess.CREATE_NO_WINDOW,
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+        try:
+            result = process_job(claimed_file, worker_id, path_map)
+        except Exception as e:
+            result = {"worker": worker_id, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            stop_heartbeat.set()
+            heartbeat_thread.join()
+
+        write_json_atomic(done_dir / f"{job_id}.json", result)
+        try:
+            claimed_file.unlink()
+        except FileNotFoundError:
+            # re-queued while we were busy
+            pass
+        print(
+            f"Job {job_id} {'failed: ' + result['error'] if 'error' in result else 'done'}."
         )
+        run_report.clear()
+        idle_since = time.monotonic()
 
-        print("Creating and importing empty timeline...")
-        # generated timeline file needs to be empty only needed to create timeline. by doing it this way we support the original fps the video was in.
-        if not sanitize_resolve_xml(xml_timeline_path):
-            print(f"Skipping {file_path.name} due to XML sanitization error.")
-            continue
 
-        if is_new_timeline:
-            print("Importing new timeline from XML...")
-            timeline_name = (
-                f"{project.GetName()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            )
-            new_timeline = media_pool.ImportTimelineFromFile(
-                str(xml_timeline_path),
-                {
-                    "timelineName": timeline_name,
-                    "importSourceClips": False,
-                },
-            )
+# --
+# -- Command line
+# --
+def run_cli(argv: list):
+    """Command line entry point for everything that runs outside of Resolve."""
+    import argparse
 
-            if not new_timeline:
-                print("ERROR: Failed to create new timeline from XML. Skipping...")
-                continue
+    parser = argparse.ArgumentParser(
+        prog="auto-silence-cut.py",
+        description="Auto Silence Cut tools that run outside of DaVinci Resolve.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
 
-            # Update global timeline object to the newly created one
-            project.SetCurrentTimeline(new_timeline)
-            global current_timeline
-            current_timeline = new_timeline
-            print(f"Successfully created and set timeline: {timeline_name}")
-            is_new_timeline = False
+    analyze = commands.add_parser(
+        "analyze",
+        help="detect silence in media files and write a segment manifest next to each of them",
+        description="Detects silence with the settings from settings.json (flags override them) and writes <name>_segments.json next to each file. Running the script in Resolve afterwards uses these instead of analyzing again, as long as the settings match.",
+    )
+    analyze.add_argument("paths", nargs="+", help="media files or folders")
+    analyze.add_argument(
+        "--recursive", action="store_true", help="also look in subfolders"
+    )
+    analyze.add_argument(
+        "--settings-dir",
+        type=Path,
+        default=Path().home() / "Documents" / "Auto Editor",
+        help="folder with settings.json and the analysis cache (default: Documents/Auto Editor)",
+    )
+    analyze.add_argument("--threshold", type=float, help="GATE_DB in dB, e.g. -30")
+    analyze.add_argument("--margin-before", type=float, help="L_TRIM_MARGIN in seconds")
+    analyze.add_argument("--margin-after", type=float, help="R_TRIM_MARGIN in seconds")
+    analyze.add_argument(
+        "--tracks", type=int, nargs="+", help="USE_AUDIO_TRACK, e.g. 0 1"
+    )
+    analyze.add_argument(
+        "--backend", choices=["auto-editor", "numpy"], help="ANALYSIS_BACKEND"
+    )
+    analyze.add_argument("--workers", type=int, help="ANALYSIS_WORKERS")
+    analyze.add_argument(
+        "--fps",
+        type=float,
+        default=30.0,
+        help="frame rate for audio only files, use your project's (default: 30)",
+    )
 
-        print("Populating timeline with clips...")
+    worker = commands.add_parser(
+        "worker",
+        help="analyze clips submitted to a shared job queue (JOB_QUEUE_DIR) by the script in Resolve",
+    )
+    worker.add_argument("queue_dir", type=Path, help="the shared JOB_QUEUE_DIR folder")
+    worker.add_argument(
+        "--path-map",
+        action="append",
+        default=[],
+        metavar="FROM=TO",
+        help="rewrite media paths of the editing machine to this one, e.g. Z:/Footage=/mnt/nas/Footage (repeatable)",
+    )
+    worker.add_argument(
+        "--settings-dir",
+        type=Path,
+        default=Path().home() / "Documents" / "Auto Editor",
+        help="folder with this worker's settings.json and analysis cache (default: Documents/Auto Editor)",
+    )
+    worker.add_argument(
+        "--idle-exit",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="exit after this long without jobs (default: run until stopped)",
+    )
 
-        populate_and_color_timeline(
-            json_path_all_clips,
-            json_path_audible_clips,
-            clip,
-            DELETE_SILENCE,
-            HIGHLIGHT_COLOR,
-            timeline_offset,
-        )
+    sweep = commands.add_parser(
+        "sweep",
+        help="preview how many cuts and how much audio every threshold/margin combination gives, from a single analysis",
+    )
+    sweep.add_argument("paths", nargs="+", help="media files or folders")
+    sweep.add_argument(
+        "--recursive", action="store_true", help="also look in subfolders"
+    )
+    sweep.add_argument(
+        "--settings-dir",
+        type=Path,
+        default=Path().home() / "Documents" / "Auto Editor",
+        help="folder with settings.json and the analysis cache (default: Documents/Auto Editor)",
+    )
+    sweep.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        help="thresholds in dB (default: PREVIEW_THRESHOLDS)",
+    )
+    sweep.add_argument(
+        "--margins",
+        type=float,
+        nargs="+",
+        help="margins in seconds, used on both sides (default: PREVIEW_MARGINS)",
+    )
+    sweep.add_argument(
+        "--tracks", type=int, nargs="+", help="USE_AUDIO_TRACK, e.g. 0 1"
+    )
+    sweep.add_argument(
+        "--fps",
+        type=float,
+        default=30.0,
+        help="frame rate for audio only files, use your project's (default: 30)",
+    )
 
-        # Increment offset for the next file
-        timeline_offset += int(clip.GetClipProperty("Frames"))
+    decode_check = commands.add_parser(
+        "decode-check",
+        help="compare reduced rate decoding (REDUCED_SAMPLE_RATE) against full rate: speed and how much the cuts change",
+    )
+    decode_check.add_argument("paths", nargs="+", help="media files or folders")
+    decode_check.add_argument(
+        "--recursive", action="store_true", help="also look in subfolders"
+    )
+    decode_check.add_argument(
+        "--settings-dir",
+        type=Path,
+        default=Path().home() / "Documents" / "Auto Editor",
+        help="folder with settings.json (default: Documents/Auto Editor)",
+    )
+    decode_check.add_argument(
+        "--rate",
+        type=int,
+        help="reduced sample rate in Hz (default: REDUCED_SAMPLE_RATE, or 8000 if that is 0)",
+    )
+    decode_check.add_argument(
+        "--tracks", type=int, nargs="+", help="USE_AUDIO_TRACK, e.g. 0 1"
+    )
+    decode_check.add_argument(
+        "--fps",
+        type=float,
+        default=30.0,
+        help="frame rate for audio only files, use your project's (default: 30)",
+    )
 
-        print(f"{file_path.name} processed.\n")
+    commands.add_parser(
+        "serve",
+        help="analysis process for WARM_ANALYSIS, the script starts these itself",
+    )
+
+    args = parser.parse_args(argv)
+    # the commands run with their own settings, flags override them
+    global settings_dir, GATE_DB, L_TRIM_MARGIN, R_TRIM_MARGIN, USE_AUDIO_TRACKS
+    global ANALYSIS_BACKEND, ANALYSIS_WORKERS
+    if args.command == "worker":
+        settings_dir = args.settings_dir
+        settings_dir.mkdir(parents=True, exist_ok=True)
+        load_settings()
+        path_map = [entry.split("=", 1) for entry in args.path_map]
+        try:
+            run_worker(args.queue_dir, path_map, args.idle_exit)
+        except KeyboardInterrupt:
+            print("Worker stopped.")
+    elif args.command == "analyze":
+        settings_dir = args.settings_dir
+        settings_dir.mkdir(parents=True, exist_ok=True)
+        load_settings()
+        # flags only apply to this run, settings.json stays as it is
+        if args.threshold is not None:
+            GATE_DB = args.threshold
+        if args.margin_before is not None:
+            L_TRIM_MARGIN = args.margin_before
+        if args.margin_after is not None:
+            R_TRIM_MARGIN = args.margin_after
+        if args.tracks:
+            USE_AUDIO_TRACKS = args.tracks
+        if args.backend:
+            if args.backend == "numpy" and np is None:
+                print("The numpy backend needs numpy installed (pip install numpy).")
+                return
+            ANALYSIS_BACKEND = args.backend
+        if args.workers is not None:
+            ANALYSIS_WORKERS = args.workers
+        run_analyze_command(args.paths, args.recursive, args.fps)
+    elif args.command == "sweep":
+        settings_dir = args.settings_dir
+        settings_dir.mkdir(parents=True, exist_ok=True)
+        load_settings()
+        if np is None:
+            print("The sweep needs numpy installed (pip install numpy).")
+            return
+        if args.tracks:
+            USE_AUDIO_TRACKS = args.tracks
+        jobs = media_jobs(args.paths, args.recursive, args.fps)
+        if not jobs:
+            print("Nothing to analyze.")
+            return
+        rows = run_sweep(
+            jobs,
+            args.thresholds or PREVIEW_THRESHOLDS,
+            args.margins or PREVIEW_MARGINS,
+        )
+        print_sweep(rows)
+    elif args.command == "decode-check":
+        settings_dir = args.settings_dir
+        settings_dir.mkdir(parents=True, exist_ok=True)
+        load_settings()
+        if np is None:
+            print("The decode check needs numpy installed (pip install numpy).")
+            return
+        if args.tracks:
+            USE_AUDIO_TRACKS = args.tracks
+        jobs = media_jobs(args.paths, args.recursive, args.fps)
+        if not jobs:
+            print("Nothing to decode.")
+            return
+        reduced_rate = args.rate or REDUCED_SAMPLE_RATE or 8000
+        print_decode_check(compare_decode_rates(jobs, reduced_rate), reduced_rate)
+    elif args.command == "serve":
+        serve_analysis()
 
 
 # --
 # -- GUI building starts here
 # --
-def open_user_interface():
+def open_user_interface(probe_progress: dict):
+    """Settings window. Opens before probing is done, the track checkboxes are added and START is enabled once `probe_progress` (see `probe_in_background()`) is finished."""
     # element IDs
     win_id = "main_window"
     coffee_button = "coffee_button"
@@ -490,7 +3708,19 @@ def open_user_interface():
     gate_db_input = "gate_db_input"
     highlight_color_input = "highlight_color_input"
     delete_silence_check = "delete_silence_check"
+    only_new_check = "only_new_check"
+    update_timeline_check = "update_timeline_check"
     skip_gui_check = "skip_ui"
+    preview_button = "preview_button"
+    preview_thresholds_input = "preview_thresholds_input"
+    preview_margins_input = "preview_margins_input"
+    preview_tree = "preview_tree"
+    preview_status = "preview_status"
+    track_group = "track_group"
+    probe_status = "probe_status"
+    probe_timer = "probe_timer"
+    preview_timer = "preview_timer"
+    sweep_progress = None
 
     # check for existing instance
     win = ui.FindWindow(win_id)
@@ -535,6 +3765,7 @@ def open_user_interface():
                     "Text": "START",
                     "Font": ui.Font({"PixelSize": 16, "Bold": True}),
                     "Weight": 0,
+                    "Enabled": False,
                 }
             ),
             ui.VGap(5),
@@ -636,7 +3867,14 @@ def open_user_interface():
                     ),
                 }
             ),
-            ui.HGroup({"Weight": 0}, construct_checkboxes(audio_track_count)),
+            ui.Label(
+                {
+                    "ID": probe_status,
+                    "Text": f"Reading audio tracks of {probe_progress['total']} clip(s)...",
+                    "Weight": 0,
+                }
+            ),
+            ui.HGroup({"ID": track_group, "Weight": 0}, []),
             # delete silence immidiately
             ui.CheckBox(
                 {
@@ -645,6 +3883,22 @@ def open_user_interface():
                     "Weight": 0,
                 }
             ),
+            # only clips that are not on a timeline yet
+            ui.CheckBox(
+                {
+                    "ID": only_new_check,
+                    "Text": "Only process clips that are new or changed since the last run?",
+                    "Weight": 0,
+                }
+            ),
+            # re-cut the timeline from an earlier run
+            ui.CheckBox(
+                {
+                    "ID": update_timeline_check,
+                    "Text": "Update the timeline from the last run instead of making a new one?",
+                    "Weight": 0,
+                }
+            ),
             # skip GUI
             ui.CheckBox(
                 {
@@ -653,6 +3907,71 @@ def open_user_interface():
                     "Weight": 0,
                 }
             ),
+            ui.VGap(5),
+            # threshold sweep preview
+            ui.HGroup(
+                {"Weight": 0},
+                [
+                    ui.Label(
+                        {
+                            "Text": "Preview Thresholds [dB]:",
+                            "Font": ui.Font(
+                                {
+                                    "Bold": True,
+                                }
+                            ),
+                        }
+                    ),
+                    ui.Label(
+                        {
+                            "Text": "Preview Margins [s]:",
+                            "Font": ui.Font(
+                                {
+                                    "Bold": True,
+                                }
+                            ),
+                        }
+                    ),
+                ],
+            ),
+            ui.HGroup(
+                {"Weight": 0},
+                [
+                    ui.LineEdit(
+                        {
+                            "ID": preview_thresholds_input,
+                        }
+                    ),
+                    ui.LineEdit(
+                        {
+                            "ID": preview_margins_input,
+                        }
+                    ),
+                ],
+            ),
+            ui.Button(
+                {
+                    "ID": preview_button,
+                    "Text": "PREVIEW",
+                    "Weight": 0,
+                    "Enabled": False,
+                }
+            ),
+            ui.Tree(
+                {
+                    "ID": preview_tree,
+                    "Weight": 1,
+                    "Events": {"ItemDoubleClicked": True},
+                }
+            ),
+            ui.Label(
+                {
+                    "ID": preview_status,
+                    "Text": "Preview analyzes the clips once and shows the result of every threshold/margin combination. Double click a row to start with it.",
+                    "WordWrap": True,
+                    "Weight": 0,
+                }
+            ),
             ui.VGap(2),
         ]
     )
@@ -662,7 +3981,7 @@ def open_user_interface():
         {
             "ID": win_id,
             "WindowTitle": "Auto Editor by Muhammed Yilmaz",
-            "Geometry": [20, 50, 530, 390],
+            "Geometry": [20, 50, 530, 640],
         },
         winLayout,
     )
@@ -690,6 +4009,19 @@ def open_user_interface():
     itm[r_trim_input].Text = str(R_TRIM_MARGIN)
     itm[gate_db_input].Text = str(GATE_DB)
     itm[delete_silence_check].Checked = DELETE_SILENCE
+    itm[only_new_check].Checked = ONLY_NEW_CLIPS
+    itm[update_timeline_check].Checked = UPDATE_TIMELINE
+    itm[preview_thresholds_input].Text = ", ".join(f"{t:g}" for t in PREVIEW_THRESHOLDS)
+    itm[preview_margins_input].Text = ", ".join(f"{m:g}" for m in PREVIEW_MARGINS)
+
+    header = itm[preview_tree].NewItem()
+    for column, title in enumerate(
+        ["Threshold [dB]", "Margin [s]", "Clips", "Kept", "Output"]
+    ):
+        header.Text[column] = title
+        itm[preview_tree].ColumnWidth[column] = 95
+    itm[preview_tree].SetHeaderItem(header)
+    itm[preview_tree].ColumnCount = 5
 
     # window events
     def save_settings():
@@ -697,22 +4029,41 @@ def open_user_interface():
 
         settings_file = settings_dir / "settings.json"
 
-        # fetching checked track checkboxes
-        USE_AUDIO_TRACKS_EDITED = []
-        for track in range(audio_track_count):
-            if itm[f"checkbox_{track}"].Checked:
-                USE_AUDIO_TRACKS_EDITED.append(track)
-
-        settings = {
-            "L_TRIM_MARGIN": input_to_float(itm[l_trim_input].Text),
-            "R_TRIM_MARGIN": input_to_float(itm[r_trim_input].Text),
-            "GATE_DB": input_to_float_dB(itm[gate_db_input].Text),
-            "USE_AUDIO_TRACK": USE_AUDIO_TRACKS_EDITED,
-            "HIGHLIGHT_COLOR": itm[highlight_color_input].CurrentText,
-            "HIGHLIGHT_COLOR_INDEX": itm[highlight_color_input].CurrentIndex,
-            "DELETE_SILENCE": itm[delete_silence_check].Checked,
-            "SKIP_GUI": itm[skip_gui_check].Checked,
-        }
+        # start from the file so settings without a GUI field are kept
+        settings = dict(DEFAULT_SETTINGS)
+        if settings_file.exists():
+            with open(settings_file, "r") as f:
+                settings.update(json.load(f))
+
+        # fetching checked track checkboxes, closed before probing was done there are none
+        # and the saved tracks stay as they are
+        USE_AUDIO_TRACKS_EDITED = settings["USE_AUDIO_TRACK"]
+        if probe_progress["finished"] and probe_progress["audio_track_count"]:
+            USE_AUDIO_TRACKS_EDITED = []
+            for track in range(probe_progress["audio_track_count"]):
+                if itm[f"checkbox_{track}"].Checked:
+                    USE_AUDIO_TRACKS_EDITED.append(track)
+
+        settings.update(
+            {
+                "L_TRIM_MARGIN": input_to_float(itm[l_trim_input].Text),
+                "R_TRIM_MARGIN": input_to_float(itm[r_trim_input].Text),
+                "GATE_DB": input_to_float_dB(itm[gate_db_input].Text),
+                "USE_AUDIO_TRACK": USE_AUDIO_TRACKS_EDITED,
+                "HIGHLIGHT_COLOR": itm[highlight_color_input].CurrentText,
+                "HIGHLIGHT_COLOR_INDEX": itm[highlight_color_input].CurrentIndex,
+                "DELETE_SILENCE": itm[delete_silence_check].Checked,
+                "ONLY_NEW_CLIPS": itm[only_new_check].Checked,
+                "UPDATE_TIMELINE": itm[update_timeline_check].Checked,
+                "SKIP_GUI": itm[skip_gui_check].Checked,
+                "PREVIEW_THRESHOLDS": parse_number_list(
+                    itm[preview_thresholds_input].Text
+                )
+                or DEFAULT_SETTINGS["PREVIEW_THRESHOLDS"],
+                "PREVIEW_MARGINS": parse_number_list(itm[preview_margins_input].Text)
+                or DEFAULT_SETTINGS["PREVIEW_MARGINS"],
+            }
+        )
         with open(settings_file, "w") as f:
             json.dump(settings, f, indent=4)
 
@@ -729,6 +4080,113 @@ def open_user_interface():
         load_settings()
         dispatcher.ExitLoop()
 
+    def on_preview(ev):
+        if np is None:
+            itm[preview_status].Text = (
+                "The preview needs numpy installed (pip install numpy)."
+            )
+            return
+        save_settings()
+        load_settings()
+        if not USE_AUDIO_TRACKS:
+            itm[preview_status].Text = "Select at least one track."
+            return
+
+        nonlocal sweep_progress
+        if sweep_progress is not None and not sweep_progress["finished"]:
+            return
+        itm[preview_button].Text = "ANALYZING..."
+        # a run started now would race the sweep for the cpu, and old rows must not be picked
+        itm[preview_button].Enabled = False
+        itm[start_button].Enabled = False
+        itm[preview_tree].Clear()
+        # the clip info comes from the resolve api, which stays on the ui thread
+        sweep_progress = sweep_in_background(
+            [job[1:] for job in clip_jobs()], PREVIEW_THRESHOLDS, PREVIEW_MARGINS
+        )
+        sweep_timer.Start()
+
+    def on_preview_timer(ev):
+        if not sweep_progress["finished"]:
+            seconds = time.perf_counter() - sweep_progress["started"]
+            itm[preview_status].Text = (
+                f"Analyzing {sweep_progress['total']} clip(s)... {seconds:.0f}s"
+            )
+            return
+        sweep_timer.Stop()
+        itm[preview_button].Text = "PREVIEW"
+        itm[preview_button].Enabled = True
+        itm[start_button].Enabled = True
+
+        rows = sweep_progress["rows"]
+        if rows is None:
+            itm[preview_status].Text = "The preview failed, see the console."
+            return
+        for row in rows:
+            item = itm[preview_tree].NewItem()
+            item.Text[0] = f"{row['GATE_DB']:g}"
+            item.Text[1] = f"{row['MARGIN']:g}"
+            item.Text[2] = str(row["segments"])
+            item.Text[3] = f"{row['kept_percent']:.1f}%"
+            item.Text[4] = format_duration(row["output_seconds"])
+            itm[preview_tree].AddTopLevelItem(item)
+        itm[preview_status].Text = (
+            "Clips: timeline clips it creates. Kept: audio that stays. Output: length without the silence. Double click a row to start with it."
+        )
+        if ANALYSIS_BACKEND != "numpy":
+            itm[
+                preview_status
+            ].Text += f" Measured with the numpy backend, a run started from a row uses it instead of {ANALYSIS_BACKEND}."
+
+    def on_preview_pick(ev):
+        global ANALYSIS_BACKEND
+        # the row's threshold and margin become the settings of the real run
+        itm[gate_db_input].Text = ev["item"].Text[0]
+        itm[l_trim_input].Text = ev["item"].Text[1]
+        itm[r_trim_input].Text = ev["item"].Text[1]
+        on_start(ev)
+        # the table was measured by the numpy backend, the run has to cut with it as well
+        # to give what the row promised (for this run only, the saved setting is untouched)
+        if ANALYSIS_BACKEND != "numpy":
+            print(
+                f"Using the numpy backend instead of {ANALYSIS_BACKEND} for this run, as the preview did."
+            )
+            ANALYSIS_BACKEND = "numpy"
+
+    def on_probe_timer(ev):
+        nonlocal itm
+        global USE_AUDIO_TRACKS
+        if not probe_progress["finished"]:
+            itm[probe_status].Text = (
+                f"Reading audio tracks... {probe_progress['probed']}/{probe_progress['total']} clip(s)"
+            )
+            return
+        timer.Stop()
+
+        audio_track_count = probe_progress["audio_track_count"]
+        if not audio_track_count:
+            itm[probe_status].Text = (
+                "The clips do not all have the same number of audio tracks. Run the script separately for clips with a different number of tracks."
+            )
+            return
+
+        # error handling
+        if not selected_tracks_available(audio_track_count):
+            USE_AUDIO_TRACKS = [0]
+            print(
+                "The audio tracks selected in user settings are not available on current clip(s) or none is selected, restoring default settings"
+            )
+        for checkbox in construct_checkboxes(audio_track_count):
+            itm[track_group].AddChild(checkbox)
+        win.RecalcLayout()
+        # the new checkboxes are only in a fresh item list
+        itm = win.GetItems()
+        itm[probe_status].Text = (
+            f"{probe_progress['total']} clip(s) with {audio_track_count} audio track(s)."
+        )
+        itm[start_button].Enabled = True
+        itm[preview_button].Enabled = True
+
     def on_coffee_button(ev):
         import webbrowser
 
@@ -738,10 +4196,22 @@ def open_user_interface():
     win.On[win_id].Close = on_close
     win.On[start_button].Clicked = on_start
     win.On[coffee_button].Clicked = on_coffee_button
+    win.On[preview_button].Clicked = on_preview
+    win.On[preview_tree].ItemDoubleClicked = on_preview_pick
+
+    # probing runs on its own thread, the ui is only updated from this timer on the ui thread
+    timer = ui.Timer({"ID": probe_timer, "Interval": 100})
+    dispatcher.On[probe_timer].Timeout = on_probe_timer
+    timer.Start()
+    # same for the preview, started by on_preview()
+    sweep_timer = ui.Timer({"ID": preview_timer, "Interval": 200})
+    dispatcher.On[preview_timer].Timeout = on_preview_timer
 
     # Show window
     win.Show()
     dispatcher.RunLoop()
+    timer.Stop()
+    sweep_timer.Stop()
 
 
 # --
@@ -749,6 +4219,15 @@ def open_user_interface():
 # --
 
 if __name__ == "__main__":
+    # command line tools (outside of resolve) take over when there are arguments
+    if len(getattr(sys, "argv", [])) > 1:
+        try:
+            run_cli(sys.argv[1:])
+        finally:
+            stop_analysis_servers()
+            cleanup_scratch()
+        exit()
+
     # set/make settings folder
     settings_dir = Path().home() / "Documents" / "Auto Editor"
     settings_dir.mkdir(exist_ok=True)
@@ -756,7 +4235,8 @@ if __name__ == "__main__":
 
     try:
         # Attempt to get the DaVinci Resolve API object
-        resolve = app.GetResolve()
+        # every API call made through it is counted for the run report
+        resolve = resolve_object(app.GetResolve())
         if resolve:
             if SKIP_GUI:
                 # i no nested if statement... bite me.
@@ -767,8 +4247,13 @@ if __name__ == "__main__":
             project = project_manager.GetCurrentProject()
             media_pool = project.GetMediaPool()
             root_folder = media_pool.GetRootFolder()
-            folders = root_folder.GetSubFolderList()
-            clips = root_folder.GetClipList()
+            media_folder = find_media_folder(root_folder, MEDIA_FOLDER)
+            if media_folder is None:
+                print(
+                    f"Media pool folder {MEDIA_FOLDER} not found, using the master folder."
+                )
+                media_folder = root_folder
+            clips = media_folder.GetClipList()
             current_timeline = project.GetCurrentTimeline()
             ui = fusion.UIManager
             dispatcher = bmd.UIDispatcher(ui)
@@ -777,33 +4262,44 @@ if __name__ == "__main__":
         print("Script must run inside DaVinci Resolve. aborting..")
         exit()
 
+    start_run_report()
+    # probing runs in the background, so the window shows up right away and gets its
+    # track checkboxes once it is done
+    probe_progress = probe_in_background(clip_file_paths())
+
+    if SKIP_GUI:
+        probe_progress["thread"].join()
+        audio_track_count = probe_progress["audio_track_count"]
+        # error handling
+        if audio_track_count and not selected_tracks_available(audio_track_count):
+            USE_AUDIO_TRACKS = [0]
+            SKIP_GUI = False
+            print(
+                "The audio tracks selected in user settings are not available on current clip(s) or none is selected, restoring default settings"
+            )
+
+    if resolve and not SKIP_GUI:
+        # open_user_interface is just a way of loading and saving settings. ezpz
+        open_user_interface(probe_progress)
+    probe_progress["thread"].join()
+
     # error handling for files with diff # audio tracks
-    audio_track_count = diff_audio_tracks()
-    if not audio_track_count:
+    if not probe_progress["audio_track_count"]:
         print(
             "The video files in the scan directory do not all contain the same number of audio tracks. Please address this issue and run the script separately for files with different # of audio tracks"
         )
         print("aborting...")
         exit()
 
-    # error handling
-    if USE_AUDIO_TRACKS and max(USE_AUDIO_TRACKS) > audio_track_count:
-        USE_AUDIO_TRACKS = [0]
-        SKIP_GUI = False
-        print(
-            "One selected audio track in user settings was not available on current clip(s) restoring default settings "
-        )
-
-    if resolve and not SKIP_GUI:
-        # open_user_interface is just a way of loading and saving settings. ezpz
-        construct_checkboxes(audio_track_count)
-        open_user_interface()
-
     # logging
     print("beginning process.")
     print("---")
 
-    main()
+    try:
+        main()
+    finally:
+        stop_analysis_servers()
+        cleanup_scratch()
 
     print("---")
     print("process complete.")
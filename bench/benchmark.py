@@ -0,0 +1,341 @@
+"""
+Benchmarks of auto-silence-cut.py that run outside of Resolve:
+
+    python bench/benchmark.py timeline --segments 100 1000 10000 100000
+    python bench/benchmark.py analysis --clips 100
+
+`timeline` measures the timeline stage against the stand-in Resolve API in
+resolve_stand_in.py, `analysis` auto-editor started per clip against WARM_ANALYSIS.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from resolve_stand_in import (
+    FakeMediaPoolItem,
+    FakeProject,
+    FakeResolveAPI,
+    load_script,
+)
+
+script = load_script()
+
+
+def synthetic_chunks(segments: int, frames_per_segment: int = 10) -> list:
+    """`segments` alternating silent/audible chunks."""
+    return [
+        (i * frames_per_segment, (i + 1) * frames_per_segment, i % 2 == 1)
+        for i in range(segments)
+    ]
+
+
+def shifted_chunks(chunks: list, every: int = 10, frames: int = 3) -> list:
+    """`chunks` with every `every`th cut moved by `frames`, what a slightly different threshold does to a clip. Both segments next to a moved cut change, the rest stays."""
+    shifted = [list(chunk) for chunk in chunks]
+    for i in range(every - 1, len(shifted) - 1, every):
+        shifted[i][1] += frames
+        shifted[i + 1][0] += frames
+    return [tuple(chunk) for chunk in shifted]
+
+
+def fill_cache(media_file: Path, chunks: list):
+    """Stores `chunks` as the cached analysis of `media_file` (a clip added with `add_clip()`) with the current settings, so main() does not analyze it."""
+    params = script.chunk_params(30.0, chunks[-1][1])
+    key = script.cache_key(script.file_fingerprint(media_file), params)
+    script.write_cache(key, "", params, chunks)
+
+
+def use_project(api: FakeResolveAPI, name: str):
+    """Points the script at a new stand-in project, like starting it in Resolve."""
+    script.project = script.resolve_object(FakeProject(api, name))
+    script.media_pool = script.project.media_pool
+    script.current_timeline = None
+    script.clips = []
+
+
+def add_clip(api: FakeResolveAPI, media_file: Path, frames: int):
+    """A media pool item for `media_file` in the script's clip list."""
+    script.clips.append(
+        script.resolve_object(
+            FakeMediaPoolItem(
+                api,
+                {
+                    "File Path": str(media_file),
+                    "Frames": str(frames),
+                    "FPS": 30.0,
+                    "Resolution": "1920x1080",
+                },
+            )
+        )
+    )
+
+
+def timed_run(run) -> float:
+    """Seconds `run()` took."""
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def run_timeline_benchmark(segment_counts: list, latency: dict, clip_count: int = 3):
+    """Times the timeline stage against `FakeResolveAPI` for every segment count and prints a table:
+
+    - populate: `populate_and_color_timeline()` of one clip on an empty timeline
+    - main: `main()` building a new timeline from `clip_count` clips
+    - new clip: `main()` with ONLY_NEW_CLIPS appending one more clip to that timeline
+    - update: `main()` with UPDATE_TIMELINE re-cutting all of them in place after a threshold change that moves every tenth cut
+
+    Runs in a temp settings folder with default settings, main() gets its analysis from pre-filled cache entries so only the timeline stage is measured.
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix="auto-silence-cut-bench-"))
+    script.settings_dir = work_dir
+    script.load_settings()
+    rows = []
+
+    def add_row(stage, segments, elapsed, api):
+        rows.append((stage, segments, elapsed, sum(api.calls.values()), api.returned))
+
+    try:
+        for segments in segment_counts:
+            chunks = synthetic_chunks(segments)
+            frames = chunks[-1][1]
+
+            api = FakeResolveAPI(latency)
+            use_project(api, f"Populate {segments}")
+            script.current_timeline = script.project.add_timeline("bench")
+            script.project.SetCurrentTimeline(script.current_timeline)
+            script.reset_timeline_index()
+            source_clip = script.resolve_object(
+                FakeMediaPoolItem(
+                    api, {"File Path": "", "Frames": str(frames), "FPS": 30.0}
+                )
+            )
+            api.calls.clear()
+            api.returned = 0
+            elapsed = timed_run(
+                lambda: script.populate_and_color_timeline(
+                    chunks,
+                    source_clip,
+                    script.DELETE_SILENCE,
+                    script.HIGHLIGHT_COLOR,
+                    0,
+                )
+            )
+            add_row("populate", segments, elapsed, api)
+
+            # the other stages work on one project, each builds on the one before
+            api = FakeResolveAPI(latency)
+            use_project(api, f"Benchmark {segments}")
+            media_files = []
+            for i in range(clip_count + 1):
+                media_file = work_dir / f"clip_{segments}_{i}.mov"
+                media_file.write_bytes(os.urandom(1024))
+                media_files.append(media_file)
+                fill_cache(media_file, chunks)
+            for media_file in media_files[:clip_count]:
+                add_clip(api, media_file, frames)
+            elapsed = timed_run(script.main)
+            add_row("main", segments * clip_count, elapsed, api)
+
+            script.ONLY_NEW_CLIPS = True
+            add_clip(api, media_files[-1], frames)
+            api.calls.clear()
+            api.returned = 0
+            elapsed = timed_run(script.main)
+            add_row("new clip", segments, elapsed, api)
+            script.ONLY_NEW_CLIPS = False
+
+            script.UPDATE_TIMELINE = True
+            script.GATE_DB -= 5
+            for media_file in media_files:
+                fill_cache(media_file, shifted_chunks(chunks))
+            api.calls.clear()
+            api.returned = 0
+            elapsed = timed_run(script.main)
+            add_row("update", segments * (clip_count + 1), elapsed, api)
+            script.load_settings()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print()
+    print(
+        f"{'stage':<10}{'segments':>10}{'seconds':>10}{'us/segment':>12}{'api calls':>11}{'items':>10}"
+    )
+    for stage, segments, elapsed, api_calls, returned in rows:
+        print(
+            f"{stage:<10}{segments:>10}{elapsed:>10.3f}{elapsed / segments * 1e6:>12.1f}{api_calls:>11}{returned:>10}"
+        )
+    return rows
+
+
+def make_test_clip(file_path: Path, seconds: float) -> bool:
+    """Writes a wav of `seconds` with a tone that is on and off every 0.75 s."""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:duration={seconds}",
+            "-af",
+            "volume='if(lt(mod(t,1.5),0.75),1,0)':eval=frame",
+            str(file_path),
+        ],
+        creationflags=script.CREATE_NO_WINDOW,
+    )
+    return result.returncode == 0
+
+
+def run_analysis_benchmark(jobs: list, clip_count: int):
+    """Runs auto-editor on `clip_count` clips (`jobs` over and over) started once per clip and then on a warm analysis process, and prints the time per clip of both. The cache is left out, every clip is really analyzed."""
+    batch = [jobs[i % len(jobs)] for i in range(clip_count)]
+    edit_param = script.auto_editor_edit_param()
+    rows = []
+    results = []
+
+    try:
+        for warm in (False, True):
+            script.WARM_ANALYSIS = warm
+            startup = 0.0
+            if warm:
+                # starting the process is paid once per run, not per clip
+                started = time.perf_counter()
+                server = script.borrow_analysis_server()
+                startup = time.perf_counter() - started
+                if server is None:
+                    break
+                script.release_analysis_server(server)
+
+            print(f"Analyzing {len(batch)} clips {'warm' if warm else 'cold'}...")
+            times = []
+            chunks = []
+            for file_path, _, _ in batch:
+                started = time.perf_counter()
+                chunks.append(script.auto_editor_analyze(file_path, edit_param, {}))
+                times.append(time.perf_counter() - started)
+            rows.append(("warm" if warm else "per clip", startup, times))
+            results.append(chunks)
+    finally:
+        script.stop_analysis_servers()
+
+    print()
+    print(
+        f"{'auto-editor':<12}{'clips':>7}{'failed':>8}{'startup s':>11}{'total s':>9}{'ms/clip':>9}{'median':>8}"
+    )
+    for (label, startup, times), chunks in zip(rows, results):
+        failed = sum(1 for c in chunks if c is None)
+        total = startup + sum(times)
+        median = sorted(times)[len(times) // 2]
+        print(
+            f"{label:<12}{len(times):>7}{failed:>8}{startup:>11.2f}{total:>9.2f}{sum(times) / len(times) * 1000:>9.1f}{median * 1000:>8.1f}"
+        )
+    if len(rows) == 2:
+        saved = (sum(rows[0][2]) - sum(rows[1][2])) / len(batch)
+        print(
+            f"warm saves {saved * 1000:.1f} ms per clip after {rows[1][1]:.2f} s startup"
+        )
+        print(f"same segments: {'yes' if results[0] == results[1] else 'NO'}")
+    return rows
+
+
+def run_cli(argv: list = None):
+    parser = argparse.ArgumentParser(
+        prog="bench/benchmark.py", description="Auto Silence Cut benchmarks."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    timeline = commands.add_parser(
+        "timeline",
+        help="time the timeline stage against a local stand-in of the Resolve API",
+    )
+    timeline.add_argument(
+        "--segments",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000, 100000],
+        help="segment counts to benchmark (default: 100 1000 10000 100000)",
+    )
+    timeline.add_argument(
+        "--clips", type=int, default=3, help="clips per main() run (default: 3)"
+    )
+    timeline.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        metavar="METHOD=SECONDS",
+        help="simulated latency per API call, e.g. AppendToTimeline=0.05 or *=0.00001 for every call (repeatable)",
+    )
+
+    analysis = commands.add_parser(
+        "analysis",
+        help="time auto-editor started for every clip against a warm analysis process (WARM_ANALYSIS)",
+    )
+    analysis.add_argument(
+        "paths",
+        nargs="*",
+        help="short media files or folders, used over and over (default: a generated test clip)",
+    )
+    analysis.add_argument(
+        "--recursive", action="store_true", help="also look in subfolders"
+    )
+    analysis.add_argument(
+        "--clips", type=int, default=100, help="clips per approach (default: 100)"
+    )
+    analysis.add_argument(
+        "--seconds",
+        type=float,
+        default=3.0,
+        help="length of the generated test clip (default: 3)",
+    )
+    analysis.add_argument(
+        "--settings-dir",
+        type=Path,
+        default=Path().home() / "Documents" / "Auto Editor",
+        help="folder with settings.json (default: Documents/Auto Editor)",
+    )
+    analysis.add_argument(
+        "--fps",
+        type=float,
+        default=30.0,
+        help="frame rate for audio only files, use your project's (default: 30)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "timeline":
+        latency = {}
+        for entry in args.latency:
+            method, _, seconds = entry.partition("=")
+            latency[method] = float(seconds)
+        run_timeline_benchmark(args.segments, latency, args.clips)
+    elif args.command == "analysis":
+        script.settings_dir = args.settings_dir
+        script.settings_dir.mkdir(parents=True, exist_ok=True)
+        script.load_settings()
+        if args.paths:
+            jobs = script.media_jobs(args.paths, args.recursive, args.fps)
+        else:
+            test_clip = script.scratch_path("benchmark.wav")
+            if not make_test_clip(test_clip, args.seconds):
+                print("Could not write the test clip, is ffmpeg on PATH?")
+                return
+            jobs = [(test_clip, args.fps, int(args.seconds * args.fps))]
+        if not jobs:
+            print("Nothing to analyze.")
+            return
+        run_analysis_benchmark(jobs, args.clips)
+
+
+if __name__ == "__main__":
+    try:
+        run_cli()
+    finally:
+        script.stop_analysis_servers()
+        script.cleanup_scratch()
@@ -0,0 +1,238 @@
+"""
+In-process stand-in for the parts of the DaVinci Resolve API auto-silence-cut.py uses,
+so the timeline stage can run (and be measured) without Resolve.
+"""
+
+import importlib.util
+import itertools
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "auto-silence-cut.py"
+
+
+def load_script():
+    """auto-silence-cut.py as a module. Its name is no valid module name, so it is loaded from its path, once per process."""
+    if "auto_silence_cut" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("auto_silence_cut", SCRIPT_PATH)
+        script = importlib.util.module_from_spec(spec)
+        sys.modules["auto_silence_cut"] = script
+        spec.loader.exec_module(script)
+    return sys.modules["auto_silence_cut"]
+
+
+class FakeResolveAPI:
+    """Shared state of one stand-in Resolve.
+
+    `latency` maps method names to seconds each call sleeps, `"*"` is the default for everything else. Calls are counted per method in `calls`, the items that calls returned in lists in `returned`.
+    """
+
+    def __init__(self, latency: dict = None):
+        self.latency = latency or {}
+        self.calls = {}
+        self.returned = 0
+        self.media_ids = itertools.count(1)
+
+    def call(self, name: str, returned: int = 0):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.returned += returned
+        delay = self.latency.get(name, self.latency.get("*", 0))
+        if delay:
+            time.sleep(delay)
+
+
+class FakeMediaPoolItem:
+    def __init__(self, api: FakeResolveAPI, properties: dict):
+        self.api = api
+        self.properties = properties
+        self.media_id = f"media-{next(api.media_ids)}"
+
+    def GetClipProperty(self, name: str = None):
+        self.api.call("GetClipProperty")
+        if name is None:
+            return dict(self.properties)
+        return self.properties.get(name, "")
+
+    def GetMediaId(self):
+        self.api.call("GetMediaId")
+        return self.media_id
+
+
+class FakeTimelineItem:
+    def __init__(
+        self,
+        api,
+        media_pool_item,
+        start: int,
+        left_offset: int,
+        duration,
+        track_type: str = "video",
+    ):
+        self.api = api
+        self.track_type = track_type
+        self.media_pool_item = media_pool_item
+        self.start = start
+        self.left_offset = left_offset
+        self.duration = duration
+        self.color = ""
+
+    def GetStart(self):
+        self.api.call("GetStart")
+        return self.start
+
+    def GetEnd(self):
+        self.api.call("GetEnd")
+        return self.start + self.duration
+
+    def GetDuration(self):
+        self.api.call("GetDuration")
+        return self.duration
+
+    def GetLeftOffset(self):
+        self.api.call("GetLeftOffset")
+        return self.left_offset
+
+    def GetMediaPoolItem(self):
+        self.api.call("GetMediaPoolItem")
+        return self.media_pool_item
+
+    def GetTrackTypeAndIndex(self):
+        self.api.call("GetTrackTypeAndIndex")
+        return [self.track_type, 1]
+
+    def SetClipColor(self, color: str):
+        self.api.call("SetClipColor")
+        self.color = color
+        return True
+
+    def ClearClipColor(self):
+        self.api.call("ClearClipColor")
+        self.color = ""
+        return True
+
+    def GetClipColor(self):
+        self.api.call("GetClipColor")
+        return self.color
+
+
+class FakeTimeline:
+    def __init__(self, api: FakeResolveAPI, name: str):
+        self.api = api
+        self.name = name
+        # one video and one (stereo) audio track, like a freshly imported timeline
+        self.tracks = {"video": [[]], "audio": [[]]}
+
+    def GetName(self):
+        self.api.call("GetName")
+        return self.name
+
+    def GetTrackCount(self, track_type: str):
+        self.api.call("GetTrackCount")
+        return len(self.tracks[track_type])
+
+    def GetItemListInTrack(self, track_type: str, index: int):
+        items = list(self.tracks[track_type][index - 1])
+        self.api.call("GetItemListInTrack", len(items))
+        return items
+
+    def DeleteClips(self, items: list, ripple: bool = False):
+        """Only the non-ripple delete the script uses, the gaps stay."""
+        self.api.call("DeleteClips")
+        deleted = {id(item) for item in items}
+        for tracks in self.tracks.values():
+            for track in tracks:
+                track[:] = [item for item in track if id(item) not in deleted]
+        return True
+
+    def GetEndFrame(self):
+        video_items = self.tracks["video"][0]
+        return max((item.start + item.duration for item in video_items), default=0)
+
+
+class FakeMediaPool:
+    def __init__(self, api: FakeResolveAPI, project):
+        self.api = api
+        self.project = project
+
+    def ImportTimelineFromFile(self, file_path: str, options: dict):
+        self.api.call("ImportTimelineFromFile")
+        if not Path(file_path).exists():
+            return None
+        return self.project.add_timeline(options.get("timelineName", "Timeline"))
+
+    def AppendToTimeline(self, clip_infos: list):
+        """Appends at the end of the timeline, or at the clip info's `recordFrame` when it has one."""
+        self.api.call("AppendToTimeline", 2 * len(clip_infos))
+        timeline = self.project.timeline
+        end_frame = timeline.GetEndFrame()
+        appended = []
+        inserted = False
+        for clip_info in clip_infos:
+            duration = clip_info["endFrame"] - clip_info["startFrame"]
+            record_frame = clip_info.get("recordFrame", end_frame)
+            inserted = inserted or "recordFrame" in clip_info
+            for track_type in ("video", "audio"):
+                item = FakeTimelineItem(
+                    self.api,
+                    clip_info["mediaPoolItem"],
+                    record_frame,
+                    clip_info["startFrame"],
+                    duration,
+                    track_type,
+                )
+                timeline.tracks[track_type][0].append(item)
+                appended.append(item)
+            end_frame = max(end_frame, record_frame + duration)
+        if inserted:
+            for tracks in timeline.tracks.values():
+                tracks[0].sort(key=lambda item: item.start)
+        return appended
+
+
+class FakeProject:
+    def __init__(self, api: FakeResolveAPI, name: str = "Benchmark"):
+        self.api = api
+        self.name = name
+        self.timeline = None
+        self.timelines = []
+        self.media_pool = FakeMediaPool(api, self)
+
+    def add_timeline(self, name: str) -> FakeTimeline:
+        """A new timeline in the project, renamed when the name is taken like Resolve does."""
+        names = {timeline.name for timeline in self.timelines}
+        unique_name = name
+        for i in itertools.count(1):
+            if unique_name not in names:
+                break
+            unique_name = f"{name} {i}"
+        timeline = FakeTimeline(self.api, unique_name)
+        self.timelines.append(timeline)
+        return timeline
+
+    def GetName(self):
+        self.api.call("GetName")
+        return self.name
+
+    def GetMediaPool(self):
+        self.api.call("GetMediaPool")
+        return self.media_pool
+
+    def GetCurrentTimeline(self):
+        self.api.call("GetCurrentTimeline")
+        return self.timeline
+
+    def SetCurrentTimeline(self, timeline):
+        self.api.call("SetCurrentTimeline")
+        self.timeline = timeline
+        return True
+
+    def GetTimelineCount(self):
+        self.api.call("GetTimelineCount")
+        return len(self.timelines)
+
+    def GetTimelineByIndex(self, index: int):
+        self.api.call("GetTimelineByIndex")
+        if 1 <= index <= len(self.timelines):
+            return self.timelines[index - 1]
+        return None
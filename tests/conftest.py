@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the Resolve stand-in and the loader for auto-silence-cut.py live with the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bench"))
+
+from resolve_stand_in import load_script  # noqa: E402
+
+
+@pytest.fixture
+def script(tmp_path):
+    """auto-silence-cut.py with default settings in a temp settings folder."""
+    script = load_script()
+    script.settings_dir = tmp_path / "settings"
+    script.settings_dir.mkdir()
+    script.load_settings()
+    yield script
+    script.stop_analysis_servers()
+    script.cleanup_scratch()
@@ -0,0 +1,103 @@
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+SAMPLE_RATE = 8000
+FPS = 29.97
+
+
+class SpeechLikePipe:
+    """ffmpeg's f32le output for `seconds` of `channels` channels: loud (speech) and quiet (pause) runs of 0.2 to 1.4 s, one after the other. Made up as it is read, so the clip itself takes no memory."""
+
+    def __init__(self, seconds: float, channels: int):
+        self.channels = channels
+        self.remaining = int(seconds * SAMPLE_RATE)
+        self.run = 0
+        self.run_left = 0
+
+    def read(self, size: int) -> bytes:
+        samples = min(size // (4 * self.channels), self.remaining)
+        levels = np.empty(samples, dtype=np.float32)
+        position = 0
+        while position < samples:
+            if not self.run_left:
+                self.run += 1
+                seconds = 0.2 + (self.run * 7919 % 13) / 10
+                self.run_left = int(seconds * SAMPLE_RATE)
+            count = min(self.run_left, samples - position)
+            levels[position : position + count] = 0.3 if self.run % 2 else 0.001
+            position += count
+            self.run_left -= count
+        self.remaining -= samples
+        # a square wave at that level on every channel
+        levels[1::2] *= -1
+        return np.repeat(levels, self.channels).tobytes()
+
+    def close(self):
+        pass
+
+
+class FakeFfmpeg:
+    """`subprocess.Popen` of the ffmpeg decode in `iter_frame_loudness_db()`."""
+
+    seconds = 0
+
+    def __init__(self, command, **kwargs):
+        # one mono stream per track, merged into one channel each
+        self.stdout = SpeechLikePipe(self.seconds, " ".join(command).count("[0:a:"))
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        self.returncode = 0
+        return 0
+
+    def kill(self):
+        self.returncode = -9
+
+
+def peak_memory(script, minutes: float) -> tuple:
+    """Peak traced memory and chunk count of the numpy analysis of a `minutes` long two track clip, run like `numpy_analyze()` but counting the chunks instead of keeping them."""
+    FakeFfmpeg.seconds = minutes * 60
+    file_path = Path(f"speech_{minutes}.mov")
+    tracemalloc.start()
+    try:
+        blocks = script.iter_envelopes(file_path, [0, 1], FPS, f"speech-{minutes}")
+        chunks = script.stream_chunks(
+            (block.max(axis=0) for block in blocks),
+            script.GATE_DB,
+            round(script.L_TRIM_MARGIN * FPS),
+            round(script.R_TRIM_MARGIN * FPS),
+            round(minutes * 60 * FPS),
+        )
+        chunk_count = sum(1 for _ in chunks)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, chunk_count
+
+
+def test_numpy_analysis_memory_does_not_grow_with_clip_length(script, monkeypatch):
+    monkeypatch.setattr(subprocess, "Popen", FakeFfmpeg)
+    monkeypatch.setattr(script, "probe_audio_stream", lambda *_: (SAMPLE_RATE, 1))
+    monkeypatch.setattr(script, "probe_media", lambda *_: {"duration": 0})
+
+    # the first run pays for one-off allocations (numpy's caches and the like)
+    peak_memory(script, 1)
+    short_peak, short_chunks = peak_memory(script, 20)
+    long_peak, long_chunks = peak_memory(script, 240)
+
+    assert short_chunks > 1000
+    assert long_chunks > 5 * short_chunks
+    assert long_peak - short_peak < 2**20
+    # a few read buffers, the decoded audio of the long clip alone would be 460 MB
+    assert long_peak < 64 * 2**20
+    # the envelopes of the whole clip were written to the cache on the way
+    envelope = np.load(script.envelope_file_for("speech-240", 0, FPS))
+    assert len(envelope) == round(240 * 60 * FPS)
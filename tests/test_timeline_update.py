@@ -0,0 +1,123 @@
+import io
+from contextlib import redirect_stdout
+
+from benchmark import (
+    add_clip,
+    fill_cache,
+    shifted_chunks,
+    synthetic_chunks,
+    use_project,
+)
+from resolve_stand_in import FakeMediaPool, FakeResolveAPI
+
+
+def timeline_state(timeline) -> dict:
+    """What an editor sees on every track: position, source range and color of each item."""
+    return {
+        track_type: [
+            sorted(
+                (
+                    item.media_pool_item.properties["File Path"],
+                    item.start,
+                    item.left_offset,
+                    item.duration,
+                    item.color,
+                )
+                for item in track
+            )
+            for track in tracks
+        ]
+        for track_type, tracks in timeline.tracks.items()
+    }
+
+
+def run_main(script, media_files, chunks):
+    """One run of the script over `media_files`, analyzed into `chunks` with the current settings."""
+    for media_file in media_files:
+        fill_cache(media_file, chunks)
+    with redirect_stdout(io.StringIO()):
+        script.main()
+
+
+def new_project(script, name, media_files, frames):
+    """A stand-in project with the media pool items of `media_files`, like opening one in Resolve."""
+    api = FakeResolveAPI()
+    use_project(api, name)
+    for media_file in media_files:
+        add_clip(api, media_file, frames)
+    return api
+
+
+def test_update_matches_a_fresh_build(script, tmp_path):
+    media_files = []
+    for i in range(3):
+        media_file = tmp_path / f"clip_{i}.mov"
+        media_file.write_bytes(bytes([i]) * 1024)
+        media_files.append(media_file)
+    before = synthetic_chunks(200)
+    after = shifted_chunks(before)
+    frames = before[-1][1]
+
+    api = new_project(script, "Update", media_files, frames)
+    run_main(script, media_files, before)
+    updated = script.project.api_object
+    script.GATE_DB = -30.0
+    script.UPDATE_TIMELINE = True
+    run_main(script, media_files, after)
+    assert api.calls["DeleteClips"] == len(media_files)
+
+    script.UPDATE_TIMELINE = False
+    new_project(script, "Fresh", media_files, frames)
+    run_main(script, media_files, after)
+    fresh = script.project.api_object
+
+    assert len(updated.timelines) == 1
+    assert timeline_state(updated.timelines[0]) == timeline_state(fresh.timelines[0])
+
+
+class FlakyMediaPool(FakeMediaPool):
+    """Lands only half of every AppendToTimeline call for the media in `failing`."""
+
+    failing = set()
+
+    def AppendToTimeline(self, clip_infos: list):
+        media_pool_item = clip_infos[0]["mediaPoolItem"]
+        if media_pool_item.properties["File Path"] in self.failing:
+            clip_infos = clip_infos[: len(clip_infos) // 2]
+        return super().AppendToTimeline(clip_infos)
+
+
+def test_failed_append_leaves_nothing_behind(script, tmp_path):
+    media_files = []
+    for i in range(3):
+        media_file = tmp_path / f"clip_{i}.mov"
+        media_file.write_bytes(bytes([i]) * 1024)
+        media_files.append(media_file)
+    chunks = synthetic_chunks(200)
+    frames = chunks[-1][1]
+    script.APPEND_CHUNK_SIZE = 30
+    script.APPEND_ATTEMPTS = 1
+    script.ONLY_NEW_CLIPS = True
+
+    new_project(script, "Flaky", media_files, frames)
+    flaky = script.project.api_object
+    flaky.media_pool = FlakyMediaPool(flaky.api, flaky)
+    script.media_pool = script.resolve_object(flaky.media_pool)
+    FlakyMediaPool.failing = {str(media_files[1])}
+    run_main(script, media_files, chunks)
+    # the clip that did not fit is gone completely, the others are untouched
+    state = timeline_state(flaky.timelines[0])
+    assert {item[0] for item in state["video"][0]} == {
+        str(media_files[0]),
+        str(media_files[2]),
+    }
+    assert len(state["video"][0]) == len(state["audio"][0]) == 2 * len(chunks)
+
+    # the next run adds it in full
+    FlakyMediaPool.failing = set()
+    run_main(script, media_files, chunks)
+    state = timeline_state(flaky.timelines[0])
+    assert len(state["video"][0]) == len(state["audio"][0]) == 3 * len(chunks)
+    assert sum(
+        1 for item in state["video"][0] if item[0] == str(media_files[1])
+    ) == len(chunks)